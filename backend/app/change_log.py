@@ -0,0 +1,102 @@
+import asyncio
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import config, models
+
+# Change log that keeps every process's in-memory indexes in step.
+#
+# Job and skill writes add (kind, entity id) rows to index_changes in their
+# own transaction. The skill indexes and the text index of every worker
+# remember how far they have read the log and, at most every
+# INDEX_SYNC_SECONDS, reload just the jobs / users changed since. A process
+# that has fallen further behind than the retained log rebuilds instead.
+
+JOB = "job"
+USER = "user"
+
+# Ids missing between two read rows may belong to transactions that haven't
+# committed yet (sequences don't commit in order); they are re-read this long
+GAP_SECONDS = 60.0
+# Larger holes are sequence jumps, not transactions in flight
+MAX_GAP = 1000
+
+
+async def log_changes(db: AsyncSession, kind: str, entity_ids: Iterable[int]):
+    """Record changed jobs or users; call before the write's commit."""
+    rows = [{"kind": kind, "entity_id": entity_id} for entity_id in dict.fromkeys(entity_ids)]
+    if not rows:
+        return
+    log = models.IndexChange
+    await db.execute(insert(log), rows)
+    await db.execute(delete(log).where(
+        log.id <= select(func.max(log.id)).scalar_subquery() - config.INDEX_CHANGE_LOG_ROWS
+    ))
+
+
+def latest_change():
+    # Log position to start reading from after loading a snapshot
+    return select(func.coalesce(func.max(models.IndexChange.id), 0))
+
+
+class ChangeCursor:
+    """How far one in-memory index has read the change log."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.position: Optional[int] = None
+        self._gaps: Dict[int, float] = {}
+        self._polled_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def start_at(self, position: int):
+        """Call with latest_change() read before the snapshot the index was loaded from."""
+        self.position = position
+        self._gaps = {}
+        self._polled_at = time.monotonic()
+
+    def due(self) -> bool:
+        return time.monotonic() - self._polled_at >= config.INDEX_SYNC_SECONDS
+
+    async def changed_ids(self, db: AsyncSession, force: bool = False) -> Optional[Set[int]]:
+        """Ids of this kind changed since the last call, or None if the index must be rebuilt.
+
+        Returns an empty set without a query unless force is set or
+        INDEX_SYNC_SECONDS have passed since the previous poll.
+        """
+        if self.position is None:
+            return None
+        if not (force or self.due()):
+            return set()
+        async with self._lock:
+            if not (force or self.due()):
+                return set()
+            log = models.IndexChange
+            rows = (await db.execute(
+                select(log.id, log.kind, log.entity_id)
+                .where(or_(log.id > self.position, log.id.in_(list(self._gaps))))
+                .order_by(log.id)
+            )).all()
+            oldest = await db.scalar(select(func.min(log.id)))
+            now = time.monotonic()
+            self._polled_at = now
+            if oldest is not None and oldest > self.position + 1:
+                # Rows this process never read have (most likely) been pruned
+                return None
+
+            changed = set()
+            previous = self.position
+            for change_id, kind, entity_id in rows:
+                self._gaps.pop(change_id, None)
+                if change_id > previous:
+                    if 1 < change_id - previous <= MAX_GAP:
+                        for missing in range(previous + 1, change_id):
+                            self._gaps.setdefault(missing, now)
+                    previous = change_id
+                if kind == self.kind:
+                    changed.add(entity_id)
+            self.position = previous
+            self._gaps = {change_id: seen for change_id, seen in self._gaps.items() if now - seen < GAP_SECONDS}
+            return changed
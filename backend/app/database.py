@@ -1,13 +1,92 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import os
+import sqlite3
+import threading
+from typing import Optional
 
-# Using SQLite for simplicity, but easily swappable for PostgreSQL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./skillnuron.db"
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from . import config
+from .metrics import instrument_engine
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+# Configured through DATABASE_URL: SQLite (aiosqlite) locally, PostgreSQL (asyncpg) in production
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+
+def async_url(url: str):
+    parsed = make_url(url)
+    if "+" not in parsed.drivername and parsed.drivername in _ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=_ASYNC_DRIVERS[parsed.drivername])
+    return parsed
+
+
+_url = async_url(SQLALCHEMY_DATABASE_URL)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+
+engine = create_async_engine(
+    _url,
+    echo=config.DB_ECHO,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=not IS_SQLITE,
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+if IS_SQLITE:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers proceed while a write is in progress; NORMAL sync is
+        # durable across app crashes in WAL mode and much cheaper than FULL
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-16000")  # ~16 MB page cache per connection
+        cursor.close()
+
+# Per-request SQL counts/time for the metrics middleware (surfaces N+1 patterns)
+instrument_engine(engine.sync_engine)
+
+# expire_on_commit=False: async code can't lazy-load expired attributes after a commit
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
+
+
+class SqliteFile:
+    """sqlite3 connection to a host-local side file (caches, job feed), opened per process.
+
+    The objects using these are created at import, before app.serve forks
+    its workers. A sqlite3 connection must not cross a fork, so it is
+    opened on first use and again in any process whose pid differs from
+    the opener's. statements (schema, pragmas) run on every new connection.
+    """
+
+    def __init__(self, path: str, *statements: str):
+        self.path = path
+        self.statements = statements
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._inherited: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Never closed here: closing the parent's connection from a child could unlock or
+                    # checkpoint the file under the parent
+                    self._inherited = self._connection
+                    connection = sqlite3.connect(self.path, check_same_thread=False)
+                    connection.execute("PRAGMA busy_timeout=5000")
+                    for statement in self.statements:
+                        connection.execute(statement)
+                    connection.commit()
+                    self._connection, self._pid = connection, os.getpid()
+        return self._connection
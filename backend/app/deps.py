@@ -1,22 +1,21 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .database import SessionLocal
 from . import models, security
+from .user_cache import CachedUser, user_cache
 
 # CHANGE: Use HTTPBearer instead of OAuth2PasswordBearer
 # This allows you to just paste the token in Swagger UI
 security_scheme = HTTPBearer()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_current_user(token_auth: HTTPAuthorizationCredentials = Depends(security_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token_auth: HTTPAuthorizationCredentials = Depends(security_scheme), db: AsyncSession = Depends(get_db)) -> CachedUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -28,12 +27,25 @@ def get_current_user(token_auth: HTTPAuthorizationCredentials = Depends(security
     try:
         payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
         email: str = payload.get("sub")
+        user_id = payload.get("uid")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
-    user = db.query(models.User).filter(models.User.email == email).first()
+
+    # Tokens issued before "uid" was added only carry the email
+    if user_id is None:
+        user_id = await db.scalar(select(models.User.id).where(models.User.email == email))
+        if user_id is None:
+            raise credentials_exception
+
+    # Served from the user cache; the DB is only hit on a miss or after a skill write
+    user = await user_cache.load(db, user_id)
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    return user
+
+async def get_current_recruiter(current_user: CachedUser = Depends(get_current_user)) -> CachedUser:
+    if current_user.role != models.UserRole.RECRUITER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Recruiter access required")
+    return current_user
@@ -0,0 +1,255 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from . import config
+from .database import SqliteFile
+from .scoring import score_candidates
+from .serialization import dumps
+from .skill_index import MATCH_THRESHOLD, normalize_skill
+
+# Live push of new and updated jobs to connected users (GET /jobs/stream).
+#
+# The job write endpoints publish each changed job once to a broker; every
+# worker process receives it and fans it out to its own connected users,
+# looking only at the subscribers that share a skill with the job.
+
+logger = logging.getLogger("app.job_feed")
+
+Deliver = Callable[[bytes], None]
+
+
+class MemoryBroker:
+    """In-process broker: a published job reaches this process's subscribers only.
+
+    Enough for a single worker. With several workers, use SqliteBroker or
+    plug in anything with the same start/stop/publish methods (e.g. Redis
+    pub/sub or PostgreSQL LISTEN/NOTIFY) via JobFeed.set_broker.
+    """
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def stop(self):
+        self._deliver = None
+
+    async def publish(self, message: bytes):
+        if self._deliver is not None:
+            self._deliver(message)
+
+
+class SqliteBroker:
+    """Messages appended to a SQLite file shared by all workers on the host.
+
+    Every process polls for rows newer than the last one it has seen, so
+    delivery latency is at most poll_seconds. Rows older than retain_seconds
+    are deleted by the publisher.
+    """
+
+    def __init__(self, db_path: str, poll_seconds: float, retain_seconds: float = 60.0):
+        self.poll_seconds = poll_seconds
+        self.retain_seconds = retain_seconds
+        self._db = SqliteFile(
+            db_path,
+            "PRAGMA journal_mode=WAL",
+            "CREATE TABLE IF NOT EXISTS job_feed ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, message BLOB NOT NULL, created_at REAL NOT NULL)",
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._last_id = 0
+
+    async def start(self, deliver: Deliver):
+        if self._task is None:
+            # Only messages published from now on
+            self._last_id = await asyncio.to_thread(self._latest)
+            self._task = asyncio.create_task(self._run(deliver))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, message: bytes):
+        await asyncio.to_thread(self._append, message)
+
+    def _latest(self) -> int:
+        return self._db.connect().execute("SELECT COALESCE(MAX(id), 0) FROM job_feed").fetchone()[0]
+
+    def _append(self, message: bytes):
+        now = time.time()
+        db = self._db.connect()
+        db.execute("INSERT INTO job_feed (message, created_at) VALUES (?, ?)", (message, now))
+        db.execute("DELETE FROM job_feed WHERE created_at < ?", (now - self.retain_seconds,))
+        db.commit()
+
+    def _fetch(self, after: int) -> list:
+        return self._db.connect().execute("SELECT id, message FROM job_feed WHERE id > ? ORDER BY id", (after,)).fetchall()
+
+    async def _run(self, deliver: Deliver):
+        while True:
+            try:
+                for self._last_id, message in await asyncio.to_thread(self._fetch, self._last_id):
+                    deliver(message)
+            except Exception:
+                logger.exception("Polling the job feed failed")
+            await asyncio.sleep(self.poll_seconds)
+
+
+class Subscription:
+    """One connected stream: the user's normalized skills and a bounded queue of SSE frames."""
+
+    def __init__(self, id: int, user_id: int, max_queued: int):
+        self.id = id
+        self.user_id = user_id
+        self.skills: Set[str] = set()
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(max_queued)
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """Next SSE frame, or None after timeout seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def sse_frame(event: str, job_id: int, data: bytes) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (job_id, event.encode(), data)
+
+
+class JobFeed:
+    """Skill -> subscriber index of this process's open streams, plus the broker.
+
+    A published job is scored only against the subscribers that have at
+    least one of its skills; those at or above MATCH_THRESHOLD get it
+    pushed. A subscriber's skills are a snapshot taken on connect and
+    re-synced by the skill write endpoints of the same process; other
+    workers' streams pick up skill edits on reconnect. Slow consumers
+    whose queue is full miss events (counted in "dropped") rather than
+    holding up the others.
+    """
+
+    def __init__(self, broker, max_subscribers: int, max_queued: int):
+        self.broker = broker
+        self.max_subscribers = max_subscribers
+        self.max_queued = max_queued
+        self._ids = itertools.count(1)
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._started = False
+        self.published = 0
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def set_broker(self, broker):
+        self.broker = broker
+
+    async def start(self):
+        if not self._started:
+            await self.broker.start(self.deliver)
+            self._started = True
+
+    async def stop(self):
+        if self._started:
+            await self.broker.stop()
+            self._started = False
+
+    # --- Subscribers ---
+    def is_full(self) -> bool:
+        return len(self._subscriptions) >= self.max_subscribers
+
+    def subscribe(self, user) -> Subscription:
+        """Open a stream for user (a user_cache.CachedUser); check is_full() first."""
+        subscription = Subscription(next(self._ids), user.id, self.max_queued)
+        self._subscriptions[subscription.id] = subscription
+        self._set_skills(subscription, user.skills)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._set_skills(subscription, ())
+        self._subscriptions.pop(subscription.id, None)
+
+    def sync_user(self, user):
+        # After a skill write: re-index every open stream of that user in this process
+        for subscription in self._subscriptions.values():
+            if subscription.user_id == user.id:
+                self._set_skills(subscription, user.skills)
+
+    # --- Publishing ---
+    async def publish(self, event: str, job: dict, skills: Iterable[str]):
+        """Send a changed job (job_to_dict output) with its normalized skills to every worker."""
+        self.published += 1
+        await self.broker.publish(dumps({"event": event, "job": job, "skills": list(skills)}))
+
+    def deliver(self, message: bytes):
+        """Broker callback: push one published job to the matching subscribers of this process."""
+        self.received += 1
+        payload = json.loads(message)
+        job, required = payload["job"], payload["skills"]
+        candidates: Dict[int, List] = defaultdict(list)
+        for skill in set(required):
+            for subscription_id in self._postings.get(skill, ()):
+                candidates[subscription_id].append((skill, None))
+        if not candidates:
+            return
+
+        subscription_ids, scores = score_candidates(required, candidates)
+        frames: Dict[int, bytes] = {}
+        for subscription_id, score in zip(subscription_ids.tolist(), scores.astype(np.int64).tolist()):
+            subscription = self._subscriptions.get(subscription_id)
+            if score < MATCH_THRESHOLD or subscription is None:
+                continue
+            # Serialized once per distinct score, not per subscriber
+            frame = frames.get(score)
+            if frame is None:
+                frame = frames[score] = sse_frame(payload["event"], job["id"], dumps({**job, "matchScore": score}))
+            try:
+                subscription.queue.put_nowait(frame)
+                self.sent += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "broker": type(self.broker).__name__,
+            "subscribers": len(self._subscriptions),
+            "indexedSkills": len(self._postings),
+            "published": self.published,
+            "received": self.received,
+            "sent": self.sent,
+            "dropped": self.dropped,
+        }
+
+    # --- internal helper ---
+    def _set_skills(self, subscription: Subscription, skills):
+        for skill in subscription.skills:
+            postings = self._postings.get(skill)
+            if postings is not None:
+                postings.discard(subscription.id)
+                if not postings:
+                    del self._postings[skill]
+        subscription.skills = {normalize_skill(s.name) for s in skills if s.name and s.name.strip()}
+        for skill in subscription.skills:
+            self._postings[skill].add(subscription.id)
+
+
+def make_broker():
+    if config.JOB_FEED_DB:
+        return SqliteBroker(config.JOB_FEED_DB, config.JOB_FEED_POLL_SECONDS)
+    return MemoryBroker()
+
+
+# Shared per-process feed used by the jobs and skills routers
+job_feed = JobFeed(make_broker(), config.JOB_FEED_MAX_SUBSCRIBERS, config.JOB_FEED_MAX_QUEUED)
@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from . import config, models, schemas
+from .change_log import JOB, log_changes
+from .match_store import match_refresher
+from .skill_index import job_index, job_skill_rows
+from .text_index import job_text_index
+
+# Bulk loading of job feeds: stream CSV/NDJSON rows, validate them with
+# schemas.JobCreate and insert them in chunks, one transaction per chunk.
+
+FORMATS = ("csv", "ndjson")
+
+# (line number, validated job) or (line number, error message)
+ParsedRow = Tuple[int, object]
+
+
+def detect_format(filename: str) -> str:
+    return "ndjson" if filename.endswith((".ndjson", ".jsonl", ".json")) else "csv"
+
+
+def parse_rows(text: IO[str], fmt: str) -> Iterator[ParsedRow]:
+    """Yield (line, JobCreate) for valid rows and (line, error) for invalid ones."""
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        rows = ((reader.line_num, row) for row in reader)
+    else:
+        rows = ((i, line) for i, line in enumerate(text, start=1) if line.strip())
+
+    for line, raw in rows:
+        try:
+            data = json.loads(raw) if fmt == "ndjson" else raw
+            yield line, schemas.JobCreate.model_validate(data)
+        except ValidationError as e:
+            yield line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        except (ValueError, TypeError) as e:
+            yield line, f"Invalid row: {e}"
+
+
+def chunked(rows: Iterable[ParsedRow], size: int) -> Iterator[List[ParsedRow]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def insert_chunk(db: AsyncSession, jobs: List[schemas.JobCreate]) -> List[Tuple[int, List[str]]]:
+    """Insert one chunk of jobs and their job_skills rows in a single transaction.
+
+    Uses Core executemany inserts instead of per-object ORM flushes. Returns
+    (job id, normalized skills) per inserted job for index maintenance.
+    """
+    result = await db.execute(
+        insert(models.Job).returning(models.Job.id, sort_by_parameter_order=True),
+        [job.model_dump() for job in jobs],
+    )
+    job_ids = result.scalars().all()
+
+    skill_rows = []
+    indexed = []
+    for job_id, job in zip(job_ids, jobs):
+        skills = job_skill_rows(job.required_skills)
+        skill_rows.extend({"job_id": job_id, "name": s.name, "normalized_name": s.normalized_name} for s in skills)
+        indexed.append((job_id, [s.normalized_name for s in skills]))
+    if skill_rows:
+        await db.execute(insert(models.JobSkill), skill_rows)
+    await log_changes(db, JOB, job_ids)
+    await db.commit()
+    return indexed
+
+
+async def import_jobs(db: AsyncSession, rows: Iterable[ParsedRow], chunk_size: int = None) -> schemas.JobImportReport:
+    """Validate and insert parsed rows chunk by chunk.
+
+    Parsing/validation of each chunk runs in the threadpool so a large feed
+    doesn't block the event loop. A chunk that fails to insert is rolled
+    back and reported row by row; later chunks still go in.
+    """
+    started = time.perf_counter()
+    imported = failed = 0
+    errors: List[schemas.JobImportError] = []
+
+    def record_error(line: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < config.JOB_IMPORT_MAX_ERRORS:
+            errors.append(schemas.JobImportError(line=line, error=message))
+
+    chunks = chunked(rows, chunk_size or config.JOB_IMPORT_CHUNK_SIZE)
+    while True:
+        chunk = await run_in_threadpool(next, chunks, None)
+        if chunk is None:
+            break
+        valid = [(line, job) for line, job in chunk if isinstance(job, schemas.JobCreate)]
+        for line, error in chunk:
+            if isinstance(error, str):
+                record_error(line, error)
+        if not valid:
+            continue
+        try:
+            indexed = await insert_chunk(db, [job for _, job in valid])
+        except Exception as e:
+            await db.rollback()
+            for line, _ in valid:
+                record_error(line, f"Insert failed: {e.__class__.__name__}")
+            continue
+        imported += len(indexed)
+        # Keep this process's in-memory index in step with the new rows
+        for (job_id, skills), (_, job) in zip(indexed, valid):
+            job_index.add_job(job_id, skills)
+            job_text_index.add_job(job_id, job.title, job.required_skills, job.description)
+        match_refresher.enqueue_jobs(job_id for job_id, _ in indexed)
+
+    seconds = time.perf_counter() - started
+    return schemas.JobImportReport(
+        imported=imported,
+        failed=failed,
+        seconds=round(seconds, 3),
+        rowsPerSecond=round((imported + failed) / seconds, 1) if seconds else 0.0,
+        errors=errors,
+    )
+
+
+async def _main(path: str, fmt: str, chunk_size: int):
+    from .database import SessionLocal
+    from .migrations import create_schema
+    from .response_cache import job_response_cache
+
+    await create_schema()
+    with open(path, newline="", encoding="utf-8") as text:
+        async with SessionLocal() as db:
+            report = await import_jobs(db, parse_rows(text, fmt), chunk_size)
+    # No background task in the CLI: materialize the new jobs' matches before exiting
+    await match_refresher.process_pending()
+    if report.imported:
+        # Running servers switch to the new text index segment on their next resume match
+        async with SessionLocal() as db:
+            await job_text_index.rebuild(db)
+        # Reaches running servers only with a shared backend (RESPONSE_CACHE_DB)
+        await job_response_cache.invalidate()
+    print(json.dumps(report.model_dump(), indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    # Usage (from backend/): python -m app.job_import feed.csv [--format ndjson] [--chunk-size 5000]
+    # Running servers pick the new jobs up in their in-memory skill index on restart.
+    parser = argparse.ArgumentParser(description="Bulk import jobs from a CSV or NDJSON file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--chunk-size", type=int, default=config.JOB_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    report = asyncio.run(_main(args.path, args.format or detect_format(args.path), args.chunk_size))
+    sys.exit(1 if report.failed and not report.imported else 0)
@@ -0,0 +1,90 @@
+import re
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import IS_SQLITE
+
+# Full-text search over jobs: title, company, description and skills.
+#
+# SQLite uses an external-content FTS5 table kept in sync by triggers on
+# jobs, ranked with bm25(). PostgreSQL uses a generated tsvector column
+# with a GIN index, ranked with ts_rank_cd. Skills are indexed from the
+# jobs.required_skills copy, which every write path keeps up to date, so
+# the triggers / generated column never need to look at job_skills.
+
+# Column weights for bm25(): title, company, description, required_skills
+_BM25_WEIGHTS = "10.0, 4.0, 1.0, 6.0"
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE jobs_fts USING fts5("
+    "title, company, description, required_skills, "
+    "content='jobs', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER jobs_fts_ai AFTER INSERT ON jobs BEGIN "
+    "INSERT INTO jobs_fts(rowid, title, company, description, required_skills) "
+    "VALUES (new.id, new.title, new.company, new.description, new.required_skills); END",
+    "CREATE TRIGGER jobs_fts_ad AFTER DELETE ON jobs BEGIN "
+    "INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, required_skills) "
+    "VALUES ('delete', old.id, old.title, old.company, old.description, old.required_skills); END",
+    "CREATE TRIGGER jobs_fts_au AFTER UPDATE ON jobs BEGIN "
+    "INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, required_skills) "
+    "VALUES ('delete', old.id, old.title, old.company, old.description, old.required_skills); "
+    "INSERT INTO jobs_fts(rowid, title, company, description, required_skills) "
+    "VALUES (new.id, new.title, new.company, new.description, new.required_skills); END",
+    # Index the rows that existed before the table was created
+    "INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')",
+]
+
+_POSTGRES_DDL = [
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(required_skills, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(company, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'D')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+
+
+def create_search_index(connection):
+    """Create the full-text index for jobs if it doesn't exist yet.
+
+    Takes a sync connection, e.g. via AsyncConnection.run_sync.
+    """
+    if connection.dialect.name == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'")
+        ).first()
+        if exists is None:
+            for statement in _SQLITE_DDL:
+                connection.execute(text(statement))
+    elif connection.dialect.name == "postgresql":
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+
+
+def search_terms(q: str) -> List[str]:
+    # Only word characters reach the query, so user input can't use (or break) FTS syntax
+    return re.findall(r"\w+", q.lower())[:16]
+
+
+async def search_job_ids(db: AsyncSession, q: str, limit: int, offset: int = 0) -> List[int]:
+    """Ids of jobs matching every term of q (prefix match), best match first."""
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    if IS_SQLITE:
+        query = " ".join(f'"{term}"*' for term in terms)
+        result = await db.execute(text(
+            f"SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH :q "
+            f"ORDER BY bm25(jobs_fts, {_BM25_WEIGHTS}), rowid "
+            f"LIMIT :limit OFFSET :offset"
+        ), {"q": query, "limit": limit, "offset": offset})
+    else:
+        query = " & ".join(f"{term}:*" for term in terms)
+        result = await db.execute(text(
+            "SELECT id FROM jobs WHERE search_vector @@ to_tsquery('english', :q) "
+            "ORDER BY ts_rank_cd(search_vector, to_tsquery('english', :q)) DESC, id "
+            "LIMIT :limit OFFSET :offset"
+        ), {"q": query, "limit": limit, "offset": offset})
+    return list(result.scalars())
@@ -0,0 +1,65 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+
+def trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex matching any of keywords, nested as a prefix trie.
+
+    A flat "a|b|c" alternation makes re try every keyword at every
+    position. Here each position is tested against the distinct first
+    characters only, and a branch is followed only while the text matches
+    it, so the cost barely grows with the number of keywords. Where one
+    keyword is a prefix of another, the longer one is tried first.
+    """
+    root: dict = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = None  # A keyword ends here
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy: continue to a longer keyword, backtrack to the one ending here
+        return "(?:" + pattern + ")?" if "" in node else pattern
+
+    return build(root)
+
+
+class KeywordMatcher:
+    """Finds keywords from several categories in one pass over the text.
+
+    All keywords are compiled into a single case-insensitive, trie-shaped
+    pattern (see trie_pattern) with word-boundary lookarounds that also
+    work for terms like "CI/CD" or "C++". At each position the longest
+    keyword wins, so "Machine Learning" beats a shorter overlap. Scanning
+    cost grows with the text length and only slightly with the number of
+    keywords (see benchmarks/bench_keywords.py).
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories = {name: list(keywords) for name, keywords in categories.items()}
+        # lowercased keyword -> [(category, keyword as listed)]
+        self._owners: Dict[str, List[tuple]] = defaultdict(list)
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                self._owners[keyword.lower()].append((category, keyword))
+
+        self._pattern = re.compile(
+            r"(?<!\w)(?:" + trie_pattern(self._owners) + r")(?!\w)",
+            re.IGNORECASE,
+        ) if self._owners else None
+
+    def scan(self, text: str) -> Dict[str, Dict[str, List[int]]]:
+        """Return {category: {keyword: [start offsets]}} for every keyword found."""
+        hits: Dict[str, Dict[str, List[int]]] = {category: {} for category in self.categories}
+        if self._pattern is None:
+            return hits
+        for match in self._pattern.finditer(text):
+            for category, keyword in self._owners[match.group().lower()]:
+                hits[category].setdefault(keyword, []).append(match.start())
+        return hits
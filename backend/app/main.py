@@ -1,72 +1,135 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
+from .database import engine
 from .routers import auth, skills, jobs, resume
-from . import models
-
-
-# Create Tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="SkillNuron AI Backend")
-
-# CORS Setup
-origins = [
-    "http://localhost:5173",  # Vite default port
-    "http://localhost:3000",
-]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Seed Mock Jobs (Optional Helper)
-@app.on_event("startup")
-def seed_db():
-    from .database import SessionLocal
-    db = SessionLocal()
-    if db.query(models.Job).count() == 0:
-        mock_jobs = [
-            models.Job(
-                title="Senior Full Stack Developer",
-                company="TechCorp Inc.",
-                location="Remote",
-                type="Full-time",
-                salary_range="$120k - $160k",
-                description="We are looking for an experienced Full Stack Developer...",
-                required_skills="React,Node.js,TypeScript,MongoDB,AWS",
-                posted_date="2025-11-20"
-            ),
-             models.Job(
-                title="Frontend Developer (React)",
-                company="StartupXYZ",
-                location="San Francisco, CA",
-                type="Full-time",
-                salary_range="$100k - $140k",
-                description="Join our fast-growing startup...",
-                required_skills="React,JavaScript,HTML/CSS,Git",
-                posted_date="2025-11-22"
-            )
-        ]
-        db.add_all(mock_jobs)
-        db.commit()
-    db.close()
-
-# Include Routers
-app.include_router(auth.router, prefix="/api/v1")
-app.include_router(skills.router, prefix="/api/v1")
-app.include_router(jobs.router, prefix="/api/v1")
-
-@app.get("/")
+from . import config, security
+from .metrics import CallbackMetric, MetricsMiddleware, registry
+from .match_store import match_refresher
+from .job_feed import job_feed
+from .response_cache import job_response_cache
+from .text_index import job_text_index
+
+# Worker pool state, read at scrape time
+_POOLS = (resume.resume_pool, security.password_pool)
+for _name, _stat, _kind, _help in (
+    ("worker_pool_pending", "pending", "gauge", "Jobs queued or running in the worker pool"),
+    ("worker_pool_completed_total", "completed", "counter", "Jobs completed by the worker pool"),
+    ("worker_pool_rejected_total", "rejected", "counter", "Jobs rejected with 503 because the pool was full"),
+    ("worker_pool_timed_out_total", "timedOut", "counter", "Jobs the caller stopped waiting for (504)"),
+):
+    registry.register(CallbackMetric(
+        _name, _help, ("pool",),
+        lambda stat=_stat: [((pool.name,), pool.stats()[stat]) for pool in _POOLS],
+        kind=_kind
+    ))
+
+# The in-process caches, indexes and queues; each stats() is read at scrape time
+for _prefix, _stats, _metrics in (
+    ("response_cache", job_response_cache.stats, (
+        ("hits_total", "hits", "counter", "Job listing / detail requests served from the response cache"),
+        ("misses_total", "misses", "counter", "Job listing / detail requests built from the database"),
+        ("not_modified_total", "notModified", "counter", "Conditional job requests answered with 304"),
+        ("entries", "entries", "gauge", "Responses currently cached"),
+    )),
+    ("resume_cache", resume.resume_cache.stats, (
+        ("hits_total", "hits", "counter", "Resume uploads whose analysis was cached"),
+        ("disk_hits_total", "diskHits", "counter", "Resume cache hits read from the SQLite file"),
+        ("misses_total", "misses", "counter", "Resume uploads parsed and analyzed"),
+        ("entries", "entries", "gauge", "Resume analyses in the in-memory cache"),
+        ("bytes", "bytes", "gauge", "Approximate size of the in-memory resume cache"),
+    )),
+    ("job_text_index", job_text_index.stats, (
+        ("jobs", "jobs", "gauge", "Jobs in the mapped text index segment"),
+        ("terms", "terms", "gauge", "Terms in the mapped text index segment"),
+        ("pending_jobs", "pendingJobs", "gauge", "Jobs written since the segment was built (overlay)"),
+        ("rebuilds_total", "rebuilds", "counter", "Text index segments built by this process"),
+    )),
+    ("match_refresh", match_refresher.stats, (
+        ("pending_users", "pendingUsers", "gauge", "Users queued for a stored-match refresh"),
+        ("pending_jobs", "pendingJobs", "gauge", "Jobs queued for a stored-match refresh"),
+        ("batches_total", "batches", "counter", "Refresh batches completed"),
+        ("users_total", "usersRefreshed", "counter", "User refreshes completed"),
+        ("jobs_total", "jobsRefreshed", "counter", "Job refreshes completed"),
+        ("failed_total", "failed", "counter", "Refresh batches that failed and were requeued"),
+        ("last_seconds", "lastSeconds", "gauge", "Duration of the last refresh batch"),
+    )),
+    ("job_feed", job_feed.stats, (
+        ("subscribers", "subscribers", "gauge", "Open job streams in this process"),
+        ("indexed_skills", "indexedSkills", "gauge", "Distinct skills of the open job streams"),
+        ("published_total", "published", "counter", "Job changes published to the broker"),
+        ("received_total", "received", "counter", "Job changes received from the broker"),
+        ("sent_total", "sent", "counter", "Job events queued to subscribers"),
+        ("dropped_total", "dropped", "counter", "Job events dropped because a subscriber's queue was full"),
+    )),
+):
+    for _name, _stat, _kind, _help in _metrics:
+        registry.register(CallbackMetric(
+            f"{_prefix}_{_name}", _help, (),
+            lambda stats=_stats, stat=_stat: [((), stats()[stat])],
+            kind=_kind
+        ))
+
+
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 def read_root():
     return {"message": "Welcome to SkillNuron AI API"}
 
-# Include Routers
-app.include_router(auth.router, prefix="/api/v1")
-app.include_router(skills.router, prefix="/api/v1")
-app.include_router(jobs.router, prefix="/api/v1")
-app.include_router(resume.router, prefix="/api/v1") # Register new router
\ No newline at end of file
+
+def create_app(settings=config) -> FastAPI:
+    """Build the API. settings: the config module or anything with the same attributes.
+
+    Importing this module has no side effects beyond building the app:
+    the schema, seed data and match store are set up by
+    `python -m app.migrations`, so workers can be forked right after import
+    (see app.serve).
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if settings.AUTO_MIGRATE:
+            from .migrations import upgrade
+            await upgrade()
+        match_refresher.start()
+        await job_feed.start()
+        try:
+            yield
+        finally:
+            await job_feed.stop()
+            await match_refresher.stop()
+            resume.resume_pool.shutdown()
+            security.password_pool.shutdown()
+            await engine.dispose()
+
+    app = FastAPI(title="SkillNuron AI Backend", lifespan=lifespan)
+
+    # Inside CORS, so browsers can read the 413
+    app.add_middleware(resume.UploadLimitMiddleware, prefix="/api/v1")
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # Outermost: times the whole request, CORS included
+    app.add_middleware(MetricsMiddleware)
+
+    # Each router exactly once: every request is matched against this list in order
+    for router in (auth.router, skills.router, jobs.router, resume.router):
+        app.include_router(router, prefix="/api/v1")
+
+    app.add_api_route("/metrics", metrics, methods=["GET"], response_class=PlainTextResponse,
+                      include_in_schema=False)
+    app.add_api_route("/", read_root, methods=["GET"])
+    return app
+
+
+# For `uvicorn app.main:app`; `uvicorn --factory app.main:create_app` works too
+app = create_app()
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from . import models
+from .database import SessionLocal
+from .skill_index import MATCH_THRESHOLD, candidate_index, job_index
+
+logger = logging.getLogger(__name__)
+
+# Users refreshed per DELETE/INSERT round trip during a full rebuild
+REBUILD_BATCH = 500
+# Delay before retrying a failed refresh batch; doubles per failure up to the max
+RETRY_SECONDS = 1.0
+MAX_RETRY_SECONDS = 60.0
+
+
+def match_rows(
+    key: str,
+    key_id: int,
+    plain: Iterable[Tuple[int, int]],
+    weighted: Iterable[Tuple[int, int]]
+) -> List[dict]:
+    """user_job_matches rows for one user (key="user_id") or job (key="job_id").
+
+    plain / weighted are (other id, score) pairs from the skill indexes;
+    a row is kept when either score reaches MATCH_THRESHOLD.
+    """
+    other = "job_id" if key == "user_id" else "user_id"
+    plain = dict(plain)
+    weighted = dict(weighted)
+    return [
+        {key: key_id, other: other_id, "score": plain.get(other_id, 0), "weighted_score": weighted.get(other_id, 0)}
+        for other_id in plain.keys() | weighted.keys()
+        if max(plain.get(other_id, 0), weighted.get(other_id, 0)) >= MATCH_THRESHOLD
+    ]
+
+
+async def refresh_users(db: AsyncSession, user_ids: Iterable[int]) -> int:
+    """Recompute all matches of the given users. Returns rows written."""
+    user_ids = list(user_ids)
+    # Pick up jobs written by other processes before replacing stored rows
+    await job_index.ensure_loaded(db, sync=True)
+    users = (await db.scalars(
+        select(models.User).options(selectinload(models.User.skills)).where(models.User.id.in_(user_ids))
+    )).all()
+
+    rows = []
+    for user in users:
+        # Only job seekers get recommendations materialized
+        if user.role != models.UserRole.JOBSEEKER:
+            continue
+        skills = [(s.name, s.level) for s in user.skills]
+        rows.extend(match_rows(
+            "user_id", user.id,
+            job_index.match(skills, threshold=1),
+            job_index.match(skills, threshold=1, weighted=True)
+        ))
+
+    await db.execute(delete(models.UserJobMatch).where(models.UserJobMatch.user_id.in_(user_ids)))
+    if rows:
+        await db.execute(insert(models.UserJobMatch), rows)
+    await db.commit()
+    return len(rows)
+
+
+async def refresh_jobs(db: AsyncSession, job_ids: Iterable[int]) -> int:
+    """Recompute the matches of the given jobs, touching only users sharing their skills.
+
+    Deleted jobs simply lose their rows. Returns rows written.
+    """
+    job_ids = list(job_ids)
+    await candidate_index.ensure_loaded(db, sync=True)
+    skills: Dict[int, List[str]] = {job_id: [] for job_id in job_ids}
+    for job_id, name in await db.execute(
+        select(models.JobSkill.job_id, models.JobSkill.normalized_name).where(models.JobSkill.job_id.in_(job_ids))
+    ):
+        skills[job_id].append(name)
+
+    rows = []
+    for job_id, names in skills.items():
+        if not names:
+            continue
+        rows.extend(match_rows(
+            "job_id", job_id,
+            candidate_index.top_candidates(names, sys.maxsize, min_score=1),
+            candidate_index.top_candidates(names, sys.maxsize, min_score=1, weighted=True)
+        ))
+
+    await db.execute(delete(models.UserJobMatch).where(models.UserJobMatch.job_id.in_(job_ids)))
+    if rows:
+        await db.execute(insert(models.UserJobMatch), rows)
+    await db.commit()
+    return len(rows)
+
+
+async def rebuild_all(db: AsyncSession) -> int:
+    """Recompute the whole store from every job seeker. Returns rows written."""
+    user_ids = (await db.scalars(
+        select(models.User.id).where(models.User.role == models.UserRole.JOBSEEKER).order_by(models.User.id)
+    )).all()
+    await db.execute(delete(models.UserJobMatch))
+    written = 0
+    for start in range(0, len(user_ids), REBUILD_BATCH):
+        written += await refresh_users(db, user_ids[start:start + REBUILD_BATCH])
+    if not user_ids:
+        await db.commit()
+    return written
+
+
+async def store_is_empty(db: AsyncSession) -> bool:
+    return await db.scalar(select(func.count()).select_from(models.UserJobMatch)) == 0
+
+
+class MatchRefresher:
+    """Coalescing background queue that keeps user_job_matches up to date.
+
+    Request handlers only enqueue user / job ids and return; a single task
+    per process drains the queue in batches, so a burst of skill edits
+    costs one refresh per user. Until a user's pending refresh has run,
+    is_pending() tells the recommendations route to score live instead.
+    Other worker processes don't see this queue: their readers may see
+    the previous matches until the writing process has drained it. Each
+    refresh first syncs the skill index it scores against with the change
+    log, so rows are never computed from another process's stale copy.
+    A failed batch stays queued and is retried with exponential backoff.
+    """
+
+    def __init__(self):
+        self._users: Set[int] = set()
+        self._jobs: Set[int] = set()
+        self._busy_users: Set[int] = set()
+        self._busy_jobs: Set[int] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._retry: Optional[asyncio.TimerHandle] = None
+        self._retry_delay = RETRY_SECONDS
+        self.batches = 0
+        self.users_refreshed = 0
+        self.jobs_refreshed = 0
+        self.failed = 0
+        self.last_seconds = 0.0
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            if self.has_work():
+                self._wakeup.set()
+
+    async def stop(self):
+        if self._retry is not None:
+            self._retry.cancel()
+            self._retry = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Don't drop refreshes that were queued right before shutdown
+        await self.process_pending()
+
+    def enqueue_user(self, user_id: int):
+        self._users.add(user_id)
+        self._notify()
+
+    def enqueue_jobs(self, job_ids: Iterable[int]):
+        self._jobs.update(job_ids)
+        self._notify()
+
+    def has_work(self) -> bool:
+        return bool(self._users or self._jobs)
+
+    def is_pending(self, user_id: int) -> bool:
+        """True when the stored matches of user_id may be out of date in this process.
+
+        A queued job refresh may touch any user, so it counts for everyone;
+        job writes are rare next to recommendation reads.
+        """
+        return (
+            self._task is None
+            or bool(self._jobs or self._busy_jobs)
+            or user_id in self._users or user_id in self._busy_users
+        )
+
+    async def process_pending(self):
+        """Run every queued refresh now, one session per batch."""
+        while self.has_work():
+            users, jobs = self._users, self._jobs
+            self._users, self._jobs = set(), set()
+            self._busy_users, self._busy_jobs = users, jobs
+            started = time.perf_counter()
+            try:
+                async with SessionLocal() as db:
+                    if users:
+                        await refresh_users(db, users)
+                    if jobs:
+                        await refresh_jobs(db, jobs)
+            except Exception:
+                self.failed += 1
+                logger.exception("Refreshing user_job_matches failed")
+                # Keep the work queued (and the users on live scoring) until the retry
+                self._users |= users
+                self._jobs |= jobs
+                self._schedule_retry()
+                break
+            else:
+                self._retry_delay = RETRY_SECONDS
+                self.batches += 1
+                self.users_refreshed += len(users)
+                self.jobs_refreshed += len(jobs)
+            finally:
+                self._busy_users, self._busy_jobs = set(), set()
+                self.last_seconds = round(time.perf_counter() - started, 4)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "pendingUsers": len(self._users),
+            "pendingJobs": len(self._jobs),
+            "batches": self.batches,
+            "usersRefreshed": self.users_refreshed,
+            "jobsRefreshed": self.jobs_refreshed,
+            "failed": self.failed,
+            "lastSeconds": self.last_seconds,
+        }
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.process_pending()
+
+    def _schedule_retry(self):
+        if self._task is None:
+            return  # stop() / job_import drain inline; nothing to wake
+        if self._retry is not None:
+            self._retry.cancel()
+        self._retry = asyncio.get_running_loop().call_later(self._retry_delay, self._notify)
+        self._retry_delay = min(self._retry_delay * 2, MAX_RETRY_SECONDS)
+
+    def _notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+
+# Shared per-process refresh queue used by the jobs and skills routers
+match_refresher = MatchRefresher()
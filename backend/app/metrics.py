@@ -0,0 +1,293 @@
+import bisect
+import contextvars
+import cProfile
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import config
+
+# In-process Prometheus-style metrics, rendered by GET /metrics.
+#
+# Values are per process: with several server workers, each one reports its
+# own counters and Prometheus sums them per instance.
+
+logger = logging.getLogger("app.slow_requests")
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, values)} {total:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), values + (le,))} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, values)} {total:.6f}")
+                lines.append(f"{self.name}_count{_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    """Gauge (or counter kept elsewhere) read at scrape time: fn() -> [(label values, value)]."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...],
+                 fn: Callable[[], Iterable[Tuple[Tuple, float]]], kind: str = "gauge"):
+        self.name, self.help, self.labels, self.fn, self.kind = name, help, labels, fn, kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in self.fn():
+            lines.append(f"{self.name}{_labels(self.labels, tuple(values))} {value:g}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route", "status")))
+REQUEST_QUERIES = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("route",), QUERY_COUNT_BUCKETS))
+REQUEST_DB_SECONDS = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request", ("route",)))
+QUERY_SECONDS = registry.register(Histogram(
+    "db_query_duration_seconds", "Latency of every SQL statement, including background work"))
+SPAN_SECONDS = registry.register(Histogram(
+    "span_duration_seconds", "Instrumented blocks (document extraction, bcrypt)", ("span",)))
+SLOW_REQUESTS = registry.register(Counter(
+    "http_slow_requests_total", "Requests slower than SLOW_REQUEST_SECONDS", ("route",)))
+
+
+# --- Per-request accounting ---
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "spans")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.spans: Dict[str, float] = {}
+
+    def server_timing(self, total: float) -> str:
+        parts = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"']
+        parts.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items())
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+# Set inside pool workers: spans are collected here and shipped back with the result
+_span_sink: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("span_sink", default=None)
+
+
+def record_span(name: str, seconds: float):
+    SPAN_SECONDS.observe(seconds, name)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.spans[name] = stats.spans.get(name, 0.0) + seconds
+
+
+@contextmanager
+def span(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        sink = _span_sink.get()
+        if sink is not None:
+            sink.append((name, seconds))
+        else:
+            record_span(name, seconds)
+
+
+def call_collecting_spans(fn: Callable, *args):
+    """Run fn in a pool worker and return (result, spans recorded during the call).
+
+    Worker processes have their own (unscraped) registry, so BoundedPool
+    records the returned spans in the server process instead.
+    """
+    token = _span_sink.set([])
+    try:
+        result = fn(*args)
+        return result, _span_sink.get()
+    finally:
+        _span_sink.reset(token)
+
+
+def instrument_engine(sync_engine):
+    """Count and time every SQL statement, globally and for the current request."""
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_started"].pop()
+        QUERY_SECONDS.observe(seconds)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+
+
+# --- Slow request log ---
+_profiler_lock = threading.Lock()
+
+
+def _start_profiler() -> Optional[cProfile.Profile]:
+    # Sampled, and one at a time: cProfile sees the whole event loop thread,
+    # so a dump also contains whatever other requests ran concurrently
+    if not config.SLOW_REQUEST_SECONDS or random.random() >= config.SLOW_REQUEST_PROFILE_RATE:
+        return None
+    if not _profiler_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _log_slow_request(method: str, route: str, status_code: int, seconds: float, stats: RequestStats,
+                      profiler: Optional[cProfile.Profile]):
+    SLOW_REQUESTS.inc(route)
+    dump = ""
+    if profiler is not None:
+        os.makedirs(config.SLOW_REQUEST_PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r"[^\w]+", "_", route).strip("_") or "root"
+        path = os.path.join(config.SLOW_REQUEST_PROFILE_DIR, f"{int(time.time() * 1000)}-{method}-{slug}.prof")
+        profiler.dump_stats(path)
+        dump = f", profile: {path}"
+    spans = ", ".join(f"{name}={value:.3f}s" for name, value in stats.spans.items()) or "none"
+    logger.warning(
+        "Slow request %s %s -> %d in %.3fs (%d queries, %.3fs in DB, spans: %s%s)",
+        method, route, status_code, seconds, stats.queries, stats.db_seconds, spans, dump,
+    )
+
+
+def route_name(scope) -> str:
+    """Route template for labels, e.g. "/api/v1/jobs/{job_id}" (keeps cardinality bounded)."""
+    template = getattr(scope.get("route"), "path_format", None)
+    if template is None:
+        return "unmatched"
+    # Routes of included routers only know their own part of the path; recover the prefix
+    try:
+        filled = template.format(**{name: value for name, value in scope.get("path_params", {}).items()})
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    return path[:len(path) - len(filled)] + template if path.endswith(filled) else template
+
+
+class MetricsMiddleware:
+    """ASGI middleware: per-route latency, SQL count/time, spans and the slow-request log.
+
+    Also adds a Server-Timing header so the same numbers show up in the
+    browser's network panel.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        profiler = _start_profiler()
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = stats.server_timing(time.perf_counter() - started).encode()
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            seconds = time.perf_counter() - started
+            _request_stats.reset(token)
+            if profiler is not None:
+                profiler.disable()
+            try:
+                route = route_name(scope)
+                REQUEST_SECONDS.observe(seconds, scope["method"], route, status_code)
+                REQUEST_QUERIES.observe(stats.queries, route)
+                REQUEST_DB_SECONDS.observe(stats.db_seconds, route)
+                if config.SLOW_REQUEST_SECONDS and seconds >= config.SLOW_REQUEST_SECONDS:
+                    _log_slow_request(scope["method"], route, status_code, seconds, stats, profiler)
+            finally:
+                if profiler is not None:
+                    _profiler_lock.release()
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .database import SessionLocal, engine, Base
+from . import models
+from .job_search import create_search_index
+from .match_store import rebuild_all, store_is_empty
+from .skill_index import job_skill_rows
+from .text_index import job_text_index
+
+# Schema creation, backfills and seed data. Run before starting the server:
+#     python -m app.migrations [--no-seed]
+# The app itself no longer touches the schema on startup (unless AUTO_MIGRATE=1).
+
+
+def existing_index_names(connection) -> set:
+    """Names of every index in the database, read from the catalog.
+
+    Reflection (and so Index.create(checkfirst=True)) skips expression
+    indexes such as uq_skills_user_id_lower_name on SQLite, so it can't be
+    used to tell whether one exists.
+    """
+    if connection.dialect.name == "sqlite":
+        query = "SELECT name FROM sqlite_master WHERE type = 'index'"
+    elif connection.dialect.name == "postgresql":
+        query = "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()"
+    else:
+        inspector = inspect(connection)
+        return {index["name"] for table in inspector.get_table_names() for index in inspector.get_indexes(table)}
+    return set(connection.execute(text(query)).scalars())
+
+
+def create_missing_indexes(connection):
+    """Create indexes declared on the models that an existing database lacks.
+
+    create_all only creates missing tables, so indexes added to tables that
+    already exist (e.g. in the shipped skillnuron.db) have to be added here.
+    Returns the names of the indexes created. Takes a sync connection, e.g.
+    via AsyncConnection.run_sync.
+    """
+    existing = existing_index_names(connection)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=connection)
+                created.append(index.name)
+    return created
+
+
+def backfill_job_skills(db: Session) -> int:
+    """Fill job_skills from the legacy required_skills column.
+
+    Only jobs that have no job_skills rows yet are touched, so running it
+    again (or on every startup) is cheap and safe. Returns the number of
+    jobs backfilled. Takes a sync Session, e.g. via AsyncSession.run_sync.
+    """
+    has_skills = select(models.JobSkill.job_id).distinct()
+    jobs = db.query(models.Job).filter(
+        models.Job.required_skills.isnot(None),
+        models.Job.required_skills != "",
+        ~models.Job.id.in_(has_skills)
+    ).all()
+    for job in jobs:
+        job.skills = job_skill_rows(job.required_skills)
+    db.commit()
+    return len(jobs)
+
+
+def dedupe_skills(connection) -> int:
+    """Keep only the newest of a user's skills that differ just in case.
+
+    Older databases allowed such duplicates; they have to go before the
+    unique (user_id, lower(name)) index can be created. Returns rows deleted.
+    Takes a sync connection.
+    """
+    skills = models.Skill.__table__
+    newest = select(func.max(skills.c.id)).group_by(skills.c.user_id, func.lower(skills.c.name))
+    return connection.execute(skills.delete().where(skills.c.id.not_in(newest))).rowcount
+
+
+async def create_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(dedupe_skills)
+        await conn.run_sync(create_missing_indexes)
+        await conn.run_sync(create_search_index)
+
+
+async def seed_mock_jobs(db: AsyncSession) -> int:
+    """Add a couple of demo jobs to an empty jobs table. Returns jobs added."""
+    if await db.scalar(select(func.count()).select_from(models.Job)):
+        return 0
+    db.add_all([
+        models.Job(
+            title="Senior Full Stack Developer",
+            company="TechCorp Inc.",
+            location="Remote",
+            type="Full-time",
+            salary_range="$120k - $160k",
+            description="We are looking for an experienced Full Stack Developer...",
+            required_skills="React,Node.js,TypeScript,MongoDB,AWS",
+            posted_date="2025-11-20"
+        ),
+        models.Job(
+            title="Frontend Developer (React)",
+            company="StartupXYZ",
+            location="San Francisco, CA",
+            type="Full-time",
+            salary_range="$100k - $140k",
+            description="Join our fast-growing startup...",
+            required_skills="React,JavaScript,HTML/CSS,Git",
+            posted_date="2025-11-22"
+        ),
+    ])
+    await db.commit()
+    return 2
+
+
+async def upgrade(seed: bool = True) -> dict:
+    await create_schema()
+    async with SessionLocal() as db:
+        report = {"seededJobs": await seed_mock_jobs(db) if seed else 0}
+        # Older databases (e.g. the shipped skillnuron.db) predate job_skills
+        report["backfilledJobs"] = await db.run_sync(backfill_job_skills)
+        # First run with user_job_matches: materialize every job seeker
+        report["materializedMatches"] = await rebuild_all(db) if await store_is_empty(db) else 0
+        # Shared, memory-mapped TF-IDF segment for /resume/match
+        await job_text_index.rebuild(db)
+        report["textIndexJobs"] = job_text_index.stats()["jobs"]
+    return report
+
+
+async def _main(seed: bool):
+    try:
+        print(await upgrade(seed))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema")
+    parser.add_argument("--no-seed", action="store_true", help="Don't add demo jobs to an empty database")
+    args = parser.parse_args()
+    asyncio.run(_main(not args.no_seed))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Enum, Index, func
 from sqlalchemy.orm import relationship
 import enum
 from .database import Base
@@ -29,8 +29,18 @@ class Skill(Base):
 
     owner = relationship("User", back_populates="skills")
 
+# One row per skill per user, case-insensitively; also the ON CONFLICT target of the skill upserts
+# (declared after the class: the expression needs the mapped column)
+Index("uq_skills_user_id_lower_name", Skill.user_id, func.lower(Skill.name), unique=True)
+
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Filter + keyset (id cursor) pagination for /jobs/all
+        Index("ix_jobs_location_id", "location", "id"),
+        Index("ix_jobs_type_id", "type", "id"),
+        Index("ix_jobs_company_id", "company", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
@@ -39,5 +49,47 @@ class Job(Base):
     type = Column(String)
     salary_range = Column(String)
     description = Column(Text)
-    required_skills = Column(String)  # Stored as comma-separated string for simplicity
-    posted_date = Column(String)
\ No newline at end of file
+    required_skills = Column(String)  # Comma-separated copy: source for the job_skills backfill and the full-text index
+    posted_date = Column(String)
+
+    skills = relationship("JobSkill", back_populates="job", cascade="all, delete-orphan", order_by="JobSkill.id")
+
+class JobSkill(Base):
+    __tablename__ = "job_skills"
+    __table_args__ = (
+        # Covers "which jobs need skill X" lookups without touching the table
+        Index("ix_job_skills_normalized_name_job_id", "normalized_name", "job_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String, nullable=False)  # As entered, e.g. "Node.js"
+    normalized_name = Column(String, nullable=False)  # Lowercased/stripped, e.g. "node.js"
+
+    job = relationship("Job", back_populates="skills")
+class UserJobMatch(Base):
+    """Materialized recommendation: a job seeker's match score for one job.
+
+    Maintained by match_store.match_refresher; rows exist only for jobs
+    where either score reaches MATCH_THRESHOLD.
+    """
+    __tablename__ = "user_job_matches"
+    __table_args__ = (
+        # /jobs/recommendations reads one user's rows best-first
+        Index("ix_user_job_matches_user_id_score", "user_id", "score"),
+        # Job refreshes drop every row of a job
+        Index("ix_user_job_matches_job_id", "job_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Integer, nullable=False)  # Unweighted match percentage
+    weighted_score = Column(Integer, nullable=False)  # Matched skills weighted by level
+
+class IndexChange(Base):
+    """A job or user whose skills or text changed, for the in-memory indexes of every process (see change_log)."""
+    __tablename__ = "index_changes"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # "job" or "user"
+    entity_id = Column(Integer, nullable=False)
@@ -0,0 +1,237 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from . import config
+from .database import SqliteFile
+from .serialization import JSONResponse, dumps
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str  # Strong validator: quoted SHA-256 of the body
+    created_at: float  # Unix time, sent as Last-Modified
+
+
+def make_entry(body: bytes) -> CachedResponse:
+    return CachedResponse(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"', int(time.time()))
+
+
+class MemoryBackend:
+    """Per-process LRU of serialized responses.
+
+    Other worker processes don't see this process's invalidations, so the
+    TTL bounds how stale their copies can get.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.created_at + self.ttl < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    async def put(self, key: str, entry: CachedResponse, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteBackend:
+    """Responses stored in a SQLite file shared by all workers on the host.
+
+    Invalidations are visible to every process immediately; the TTL and
+    max_entries (oldest dropped first) only keep the file small. Queries
+    run in the thread pool. Any object with the same generation/get/put/
+    clear coroutines (e.g. a Redis client wrapper) can be plugged in
+    instead via set_backend.
+    """
+
+    def __init__(self, db_path: str, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._file = SqliteFile(
+            db_path,
+            "PRAGMA journal_mode=WAL",
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT NOT NULL, created_at REAL NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS ix_response_cache_created_at ON response_cache (created_at)",
+            # Bumped by every clear(), so a response built before it isn't stored after it
+            "CREATE TABLE IF NOT EXISTS response_cache_generation ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL)",
+            "INSERT OR IGNORE INTO response_cache_generation (id, value) VALUES (0, 0)",
+        )
+
+    async def generation(self) -> int:
+        return await run_in_threadpool(self._query, "SELECT value FROM response_cache_generation")
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        row = await run_in_threadpool(self._get, key)
+        return CachedResponse(*row) if row else None
+
+    async def put(self, key: str, entry: CachedResponse, generation: int):
+        await run_in_threadpool(self._put, key, entry, generation)
+
+    async def clear(self):
+        await run_in_threadpool(self._clear)
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM response_cache")
+
+    # --- blocking helpers (thread pool) ---
+    def _query(self, sql: str):
+        with self._lock:
+            return self._file.connect().execute(sql).fetchone()[0]
+
+    def _get(self, key: str):
+        with self._lock:
+            return self._file.connect().execute(
+                "SELECT body, etag, created_at FROM response_cache WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+
+    def _put(self, key: str, entry: CachedResponse, generation: int):
+        with self._lock:
+            db = self._file.connect()
+            # Stored only if no clear() has happened since the caller read generation
+            db.execute(
+                "INSERT OR REPLACE INTO response_cache (key, body, etag, created_at) "
+                "SELECT ?, ?, ?, ? FROM response_cache_generation WHERE value = ?",
+                (key, entry.body, entry.etag, entry.created_at, generation),
+            )
+            db.execute("DELETE FROM response_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            db.execute(
+                "DELETE FROM response_cache WHERE key IN "
+                "(SELECT key FROM response_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            db.commit()
+
+    def _clear(self):
+        with self._lock:
+            db = self._file.connect()
+            db.execute("DELETE FROM response_cache")
+            db.execute("UPDATE response_cache_generation SET value = value + 1")
+            db.commit()
+
+
+class ResponseCache:
+    """Serialized GET responses with ETag / Last-Modified revalidation.
+
+    Entries are keyed by path + sorted query string and dropped as a whole
+    by invalidate(), which every write to the cached resource must call.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def set_backend(self, backend):
+        self.backend = backend
+
+    @staticmethod
+    def key(request: Request) -> str:
+        return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+    async def invalidate(self):
+        await self.backend.clear()
+
+    async def respond(self, request: Request, build: Callable[[], Awaitable[Any]]) -> Response:
+        """Serve request from the cache, calling build() on a miss.
+
+        build returns JSON-ready dicts/lists, serialized once here. Exceptions
+        from build (e.g. a 404 HTTPException) propagate and nothing is cached.
+        A response built while an invalidate() ran is served but not stored.
+        """
+        key = self.key(request)
+        entry = await self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            generation = await self.backend.generation()
+            entry = make_entry(dumps(await build()))
+            await self.backend.put(key, entry, generation)
+        else:
+            self.hits += 1
+
+        headers = {
+            "ETag": entry.etag,
+            "Last-Modified": formatdate(entry.created_at, usegmt=True),
+            # Clients may store the response but must revalidate before reuse
+            "Cache-Control": "no-cache",
+        }
+        if not_modified(request, entry):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(entry.body, headers=headers)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "notModified": self.not_modified,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.backend),
+            "backend": type(self.backend).__name__,
+        }
+
+
+def not_modified(request: Request, entry: CachedResponse) -> bool:
+    # If-None-Match wins over If-Modified-Since when both are sent (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison, as If-None-Match requires
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return entry.created_at <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def make_backend():
+    if config.RESPONSE_CACHE_DB:
+        return SqliteBackend(config.RESPONSE_CACHE_DB, config.RESPONSE_CACHE_ENTRIES, config.RESPONSE_CACHE_TTL)
+    return MemoryBackend(config.RESPONSE_CACHE_ENTRIES, config.RESPONSE_CACHE_TTL)
+
+
+# Cache for the public job listing / detail routes
+job_response_cache = ResponseCache(make_backend())
@@ -0,0 +1,194 @@
+import hashlib
+import io
+import json
+import logging
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple, Union
+from . import config
+from .keyword_matcher import KeywordMatcher
+from .metrics import span
+
+# A file path, raw bytes or an open binary file
+DocumentSource = Union[str, bytes, BinaryIO]
+
+logger = logging.getLogger(__name__)
+
+# Pure parsing/analysis code for routers/resume.py. Nothing here touches
+# FastAPI or the database so it can run inside worker processes.
+#
+# pypdf and python-docx are imported on first use: with a process pool only
+# the pool workers ever parse documents, so server workers never load them.
+
+class ResumeError(Exception):
+    """Raised for uploads that cannot be analyzed; mapped to an HTTP error by the router."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+# --- CONSTANTS FOR ANALYSIS ---
+# In a real ML app, these would come from a database or NLP model
+high_value_keywords = ["Python", "Java", "React", "AWS", "Docker", "Kubernetes", "Machine Learning", "CI/CD", "SQL", "FastAPI"]
+soft_skills = ["Leadership", "Communication", "Problem Solving", "Agile", "Teamwork"]
+action_verbs = ["Spearheaded", "Developed", "Orchestrated", "Engineered", "Managed", "Led"]
+
+# Bump when the scoring rules change; cached analyses from older versions are ignored
+ANALYZER_VERSION = 2
+# Changes automatically whenever the keyword lists or ANALYZER_VERSION change
+ANALYSIS_VERSION = hashlib.sha256(
+    json.dumps([ANALYZER_VERSION, high_value_keywords, soft_skills, action_verbs]).encode()
+).hexdigest()[:12]
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+# Built once per process; one scan of the resume covers every keyword list
+keyword_matcher = KeywordMatcher({
+    "high_value": high_value_keywords,
+    "soft_skills": soft_skills,
+    "action_verbs": action_verbs,
+})
+
+def iter_pdf_pages(source, max_pages: int) -> Iterator[str]:
+    import pypdf
+
+    pdf_reader = pypdf.PdfReader(source)
+    for i, page in enumerate(pdf_reader.pages):
+        if i >= max_pages:
+            break
+        yield (page.extract_text() or "") + "\n"
+
+def iter_docx_paragraphs(source) -> Iterator[str]:
+    import docx
+
+    doc = docx.Document(source)
+    for para in doc.paragraphs:
+        yield para.text + "\n"
+
+def collect_text(chunks: Iterable[str], max_chars: int) -> str:
+    # Join once instead of text += ..., and stop pulling pages/paragraphs at the cap
+    parts = []
+    remaining = max_chars
+    for chunk in chunks:
+        if len(chunk) >= remaining:
+            parts.append(chunk[:remaining])
+            break
+        parts.append(chunk)
+        remaining -= len(chunk)
+    return "".join(parts)
+
+def extract_text_from_pdf(source, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    with span("pdf_extract"):
+        return collect_text(
+            iter_pdf_pages(source, max_pages or config.RESUME_MAX_PAGES),
+            max_chars or config.RESUME_MAX_CHARS,
+        )
+
+def extract_text_from_docx(source, max_chars: Optional[int] = None) -> str:
+    with span("docx_extract"):
+        return collect_text(iter_docx_paragraphs(source), max_chars or config.RESUME_MAX_CHARS)
+
+def calculate_section_score(found: int) -> int:
+    # found = number of distinct keywords of the section present in the resume
+    if not found: return 50
+    # Simple curve: 5 keywords = 100%
+    return min(50 + (found * 10), 100)
+
+def check_format(filename: str):
+    if not filename.endswith(SUPPORTED_EXTENSIONS):
+        raise ResumeError(400, "Invalid format. Use PDF or DOCX.")
+
+def extract_text(filename: str, source: DocumentSource) -> str:
+    check_format(filename)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    # pypdf and python-docx both accept a path, so large uploads are read from disk lazily
+    if filename.endswith(".pdf"):
+        return extract_text_from_pdf(source)
+    return extract_text_from_docx(source)
+
+def analyze_document(filename: str, source: DocumentSource) -> Tuple[str, dict]:
+    """Parse an uploaded PDF/DOCX and analyze it (runs in a worker process).
+
+    Returns the extracted text and the ResumeAnalysisResponse payload.
+    """
+    # 1. EXTRACT TEXT
+    try:
+        text = extract_text(filename, source)
+    except ResumeError:
+        raise
+    except Exception:
+        logger.exception("Error parsing %s", filename)
+        raise ResumeError(500, "Could not parse file content.")
+
+    if len(text.strip()) < 50:
+        raise ResumeError(400, "Resume content is too short or unreadable.")
+
+    return text, analyze_text(text)
+
+def analyze_text(text: str) -> dict:
+    # 2. PERFORM ANALYSIS (Rule-Based Heuristics)
+    
+    # Detect Keywords (single pass over the text for all keyword lists)
+    hits = keyword_matcher.scan(text)
+    present_keywords = [kw for kw in high_value_keywords if kw in hits["high_value"]]
+    missing_keywords = [kw for kw in high_value_keywords if kw not in hits["high_value"]]
+    
+    # Calculate Scores
+    tech_score = calculate_section_score(len(present_keywords))
+    format_score = 90 if text.count('\n') + 1 > 20 else 60 # Simple line check
+    impact_score = calculate_section_score(len(hits["action_verbs"]))
+    
+    overall_score = int((tech_score + format_score + impact_score) / 3)
+
+    # Generate Dynamic Feedback
+    strengths = []
+    if len(present_keywords) >= 3:
+        strengths.append({
+            "title": "Strong Technical Base", 
+            "description": f"Found key skills: {', '.join(present_keywords[:3])}", 
+            "type": "strength"
+        })
+    if impact_score > 80:
+        strengths.append({
+            "title": "Action-Oriented Language", 
+            "description": "Good use of strong action verbs (e.g., Led, Engineered).", 
+            "type": "strength"
+        })
+
+    improvements = []
+    if len(missing_keywords) > 0:
+        improvements.append({
+            "title": "Missing High-Value Skills",
+            "description": f"Consider adding: {', '.join(missing_keywords[:3])}",
+            "type": "improvement",
+            "severity": "high"
+        })
+    if impact_score < 70:
+        improvements.append({
+            "title": "Weak Impact Verbs",
+            "description": "Use words like 'Spearheaded' or 'Orchestrated' instead of 'Worked on'.",
+            "type": "improvement",
+            "severity": "medium"
+        })
+
+    # 3. RETURN STRUCTURED RESPONSE
+    return {
+        "overallScore": overall_score,
+        "atsCompatibility": 85, # Placeholder for complex regex logic
+        "contentQuality": impact_score,
+        "formatting": format_score,
+        "keywordOptimization": tech_score,
+        "impactScore": impact_score,
+        "sections": [
+            {"section": "Contact Information", "score": 100, "status": "excellent", "feedback": "detected"},
+            {"section": "Skills", "score": tech_score, "status": "good" if tech_score > 75 else "average", "feedback": f"{len(present_keywords)} keywords found"},
+            {"section": "Work Experience", "score": impact_score, "status": "good" if impact_score > 75 else "average", "feedback": "Action verbs analyzed"},
+        ],
+        "strengths": strengths,
+        "improvements": improvements,
+        "keywords": {
+            "present": present_keywords,
+            "missing": missing_keywords,
+            "recommended": ["System Design", "Scalability"] # specific recommendations
+        }
+    }
\ No newline at end of file
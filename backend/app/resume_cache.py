@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from starlette.concurrency import run_in_threadpool
+from .database import SqliteFile
+from .resume_analysis import ANALYSIS_VERSION
+
+
+class CachedResume(NamedTuple):
+    text: str
+    analysis: dict
+    size: int
+
+
+class ResumeCache:
+    """Resume analysis results keyed by the SHA-256 hex digest of the uploaded bytes.
+
+    The key also carries ANALYSIS_VERSION, so editing the keyword lists
+    invalidates old entries. Entries live in an in-memory LRU bounded by
+    entry count and total size; with db_path set, they are also written to
+    a SQLite file that survives restarts and is shared between workers.
+    That file keeps the newest max_db_entries rows; its queries run in the
+    thread pool.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, db_path: str = "", max_db_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_db_entries = max_db_entries
+        self._entries: "OrderedDict[str, CachedResume]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = SqliteFile(
+            db_path,
+            "CREATE TABLE IF NOT EXISTS resume_cache ("
+            "key TEXT PRIMARY KEY, text TEXT NOT NULL, analysis TEXT NOT NULL, created_at REAL NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS ix_resume_cache_created_at ON resume_cache (created_at)",
+        ) if db_path else None
+
+    @staticmethod
+    def key(sha256_hex: str) -> str:
+        return f"{ANALYSIS_VERSION}:{sha256_hex}"
+
+    async def get(self, key: str) -> Optional[CachedResume]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        row = await run_in_threadpool(self._get_row, key) if self._db is not None else None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+        # Promote to memory so the next hit skips SQLite
+        return self._put_memory(key, row[0], json.loads(row[1]))
+
+    async def put(self, key: str, text: str, analysis: dict):
+        self._put_memory(key, text, analysis)
+        if self._db is not None:
+            await run_in_threadpool(self._put_row, key, text, json.dumps(analysis))
+
+    async def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self._db is not None:
+            await run_in_threadpool(self._clear_rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "persistent": self._db is not None,
+            }
+
+    # --- blocking helpers (thread pool) ---
+    def _get_row(self, key: str):
+        with self._lock:
+            return self._db.connect().execute(
+                "SELECT text, analysis FROM resume_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _put_row(self, key: str, text: str, analysis: str):
+        with self._lock:
+            db = self._db.connect()
+            db.execute(
+                "INSERT OR REPLACE INTO resume_cache (key, text, analysis, created_at) VALUES (?, ?, ?, ?)",
+                (key, text, analysis, time.time()),
+            )
+            db.execute(
+                "DELETE FROM resume_cache WHERE key IN "
+                "(SELECT key FROM resume_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_db_entries,),
+            )
+            db.commit()
+
+    def _clear_rows(self):
+        with self._lock:
+            db = self._db.connect()
+            db.execute("DELETE FROM resume_cache")
+            db.commit()
+
+    def _put_memory(self, key: str, text: str, analysis: dict) -> CachedResume:
+        # Rough size: text plus the serialized analysis
+        entry = CachedResume(text, analysis, len(text) + len(json.dumps(analysis)))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            if entry.size > self.max_bytes:
+                return entry
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+        return entry
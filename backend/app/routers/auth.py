@@ -1,17 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models, schemas, security, deps
 from datetime import timedelta
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+async def _get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(models.User).where(models.User.email == email))
+
 @router.post("/signup", response_model=schemas.UserResponse)
-def signup(user: schemas.UserCreate, db: Session = Depends(deps.get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def signup(user: schemas.UserCreate, db: AsyncSession = Depends(deps.get_db)):
+    db_user = await _get_user_by_email(db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = security.get_password_hash(user.password)
+    hashed_password = await security.hash_password_async(user.password)
     new_user = models.User(
         email=user.email,
         full_name=user.full_name,
@@ -19,24 +23,31 @@ def signup(user: schemas.UserCreate, db: Session = Depends(deps.get_db)):
         role=user.role
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     return new_user
 
 @router.post("/login", response_model=schemas.Token)
-def login(user_credentials: schemas.UserLogin, db: Session = Depends(deps.get_db)):
-    user = db.query(models.User).filter(models.User.email == user_credentials.email).first()
-    
-    if not user or not security.verify_password(user_credentials.password, user.hashed_password):
+async def login(user_credentials: schemas.UserLogin, db: AsyncSession = Depends(deps.get_db)):
+    user = await _get_user_by_email(db, user_credentials.email)
+
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await security.verify_password_async(user_credentials.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Transparently upgrade hashes made with an old bcrypt cost
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     
     access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        data={"sub": user.email, "role": user.role.value}, 
+        data={"sub": user.email, "uid": user.id, "role": user.role.value}, 
         expires_delta=access_token_expires
     )
     
@@ -46,4 +57,4 @@ def login(user_credentials: schemas.UserLogin, db: Session = Depends(deps.get_db
         "user_id": user.id,
         "user_name": user.full_name,
         "role": user.role.value
-    }
\ No newline at end of file
+    }
@@ -1,15 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from .. import models, schemas, deps
+import io
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from .. import config, models, schemas, deps
+from ..change_log import JOB, log_changes
+from ..job_feed import job_feed
+from ..job_import import FORMATS, detect_format, import_jobs, parse_rows
+from ..job_search import search_job_ids
+from ..match_store import match_refresher
+from ..response_cache import job_response_cache
+from ..serialization import JSONResponse, job_to_dict
+from ..skill_index import MATCH_THRESHOLD, candidate_index, job_index, job_skill_rows, normalize_skill
+from ..text_index import job_text_index
+from ..user_cache import CachedUser
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
+
+# Job queries always eager-load skills: async sessions can't lazy-load them later
+def select_jobs():
+    return select(models.Job).options(selectinload(models.Job.skills))
+
 # --- CREATE (POST) ---
 @router.post("/", response_model=schemas.JobResponse)
-def create_job(
+async def create_job(
     job: schemas.JobCreate,
-    db: Session = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_db)
 ):
     db_job = models.Job(
         title=job.title,
@@ -19,119 +39,242 @@ def create_job(
         salary_range=job.salary_range,
         description=job.description,
         required_skills=job.required_skills,
-        posted_date=job.posted_date
+        posted_date=job.posted_date,
+        skills=job_skill_rows(job.required_skills)
     )
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
-    
-    return schemas.JobResponse(
-        id=db_job.id,
-        title=db_job.title,
-        company=db_job.company,
-        location=db_job.location,
-        type=db_job.type,
-        salary_range=db_job.salary_range,
-        requiredSkills=db_job.required_skills.split(",") if db_job.required_skills else [],
-        description=db_job.description,
-        postedDate=db_job.posted_date,
-        matchScore=0
-    )
+    await db.flush()
+    await log_changes(db, JOB, [db_job.id])
+    await db.commit()
+    skills = [s.normalized_name for s in db_job.skills]
+    job_index.add_job(db_job.id, skills)
+    job_text_index.add_job(db_job.id, db_job.title, db_job.required_skills, db_job.description)
+    await job_response_cache.invalidate()
+    match_refresher.enqueue_jobs([db_job.id])
+    job = job_to_dict(db_job)
+    await job_feed.publish("created", job, skills)
+
+    return JSONResponse(job)
+
+# --- BULK IMPORT (POST) ---
+@router.post("/bulk", response_model=schemas.JobImportReport)
+async def bulk_import_jobs(
+    file: UploadFile = File(..., description="CSV with a header row (JobCreate field names) or NDJSON, one job per line"),
+    format: Optional[str] = Query(None, description="csv or ndjson; guessed from the file name if omitted"),
+    chunk_size: Optional[int] = Query(None, ge=1, le=10000),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: CachedUser = Depends(deps.get_current_recruiter)
+):
+    fmt = format or detect_format(file.filename or "")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Use one of: {', '.join(FORMATS)}")
+
+    # Rows are decoded and validated lazily, one chunk at a time
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        report = await import_jobs(db, parse_rows(text, fmt), chunk_size)
+    finally:
+        text.detach()
+    if report.imported:
+        await job_response_cache.invalidate()
+    return report
 
 # --- READ ALL (GET) ---
 # MOVED UP: Must be before /{job_id}
-@router.get("/all", response_model=List[schemas.JobResponse])
-def read_all_jobs(db: Session = Depends(deps.get_db)):
-    jobs = db.query(models.Job).all()
-    results = []
-    for job in jobs:
-        results.append(schemas.JobResponse(
-            id=job.id,
-            title=job.title,
-            company=job.company,
-            location=job.location,
-            type=job.type,
-            salary_range=job.salary_range,
-            requiredSkills=job.required_skills.split(",") if job.required_skills else [],
-            description=job.description,
-            postedDate=job.posted_date,
-            matchScore=0
-        ))
-    return results
+@router.get("/all", response_model=schemas.JobPage)
+async def read_all_jobs(
+    request: Request,
+    cursor: Optional[int] = Query(None, description="Return jobs with id greater than this (nextCursor of the previous page)"),
+    limit: int = Query(20, ge=1, le=100),
+    location: Optional[str] = None,
+    type: Optional[str] = None,
+    company: Optional[str] = None,
+    skill: Optional[str] = None,
+    db: AsyncSession = Depends(deps.get_db)
+):
+    async def build_page():
+        query = select_jobs()
+        if location:
+            query = query.where(models.Job.location == location)
+        if type:
+            query = query.where(models.Job.type == type)
+        if company:
+            query = query.where(models.Job.company == company)
+        if skill:
+            query = query.where(models.Job.skills.any(models.JobSkill.normalized_name == normalize_skill(skill)))
+        if cursor is not None:
+            query = query.where(models.Job.id > cursor)
+
+        # Keyset pagination: fetch one extra row to know whether another page exists
+        jobs = (await db.scalars(query.order_by(models.Job.id).limit(limit + 1))).all()
+        next_cursor = None
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            next_cursor = jobs[-1].id
+
+        return {"jobs": [job_to_dict(job) for job in jobs], "nextCursor": next_cursor}
+
+    # Served from the response cache; answers If-None-Match / If-Modified-Since with 304
+    return await job_response_cache.respond(request, build_page)
+
+# --- SEARCH (GET) ---
+# MOVED UP: Must be before /{job_id}
+@router.get("/search", response_model=schemas.JobSearchPage)
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to match in title, company, description and skills"),
+    offset: int = Query(0, ge=0, le=10000),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(deps.get_db)
+):
+    # Ranked ids come from the full-text index; fetch one extra to know whether another page exists
+    job_ids = await search_job_ids(db, q, limit + 1, offset)
+    next_offset = None
+    if len(job_ids) > limit:
+        job_ids = job_ids[:limit]
+        next_offset = offset + limit
+    if not job_ids:
+        return JSONResponse({"jobs": [], "nextOffset": None})
+
+    jobs = (await db.scalars(select_jobs().where(models.Job.id.in_(job_ids)))).all()
+    jobs_by_id = {job.id: job for job in jobs}
+
+    return JSONResponse({
+        "jobs": [job_to_dict(jobs_by_id[job_id]) for job_id in job_ids if job_id in jobs_by_id],
+        "nextOffset": next_offset
+    })
 
 # --- RECOMMENDATIONS (GET) ---
 # MOVED UP: Must be before /{job_id}
 @router.get("/recommendations", response_model=List[schemas.JobResponse])
-def get_recommendations(
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user)
+async def get_recommendations(
+    weighted: bool = Query(False, description="Weight each matched skill by the user's level (0-100)"),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: CachedUser = Depends(deps.get_current_user)
 ):
-    jobs = db.query(models.Job).all()
-    
-    user_skill_names = {s.name.lower().strip() for s in current_user.skills}
-    
-    results = []
-    for job in jobs:
-        req_skills_list = [s.strip() for s in job.required_skills.split(",")] if job.required_skills else []
-        
-        if not req_skills_list:
-            score = 0
-        else:
-            match_count = sum(1 for s in req_skills_list if s.lower() in user_skill_names)
-            total_req = len(req_skills_list)
-            score = int((match_count / total_req) * 100)
-        
-        # FILTER: Only show jobs with score >= 50
-        if score >= 50:
-            job_resp = schemas.JobResponse(
-                id=job.id,
-                title=job.title,
-                company=job.company,
-                location=job.location,
-                type=job.type,
-                salary_range=job.salary_range,
-                requiredSkills=req_skills_list,
-                description=job.description,
-                postedDate=job.posted_date,
-                matchScore=score
-            )
-            results.append(job_resp)
-        
-    results.sort(key=lambda x: x.matchScore, reverse=True)
-    return results
+    # Job seekers read their materialized matches: one indexed query, best first
+    if current_user.role == models.UserRole.JOBSEEKER and not match_refresher.is_pending(current_user.id):
+        score = models.UserJobMatch.weighted_score if weighted else models.UserJobMatch.score
+        rows = (await db.execute(
+            select_jobs().add_columns(score)
+            .join(models.UserJobMatch, models.UserJobMatch.job_id == models.Job.id)
+            .where(models.UserJobMatch.user_id == current_user.id, score >= MATCH_THRESHOLD)
+            .order_by(score.desc(), models.Job.id)
+        )).all()
+        return JSONResponse([job_to_dict(job, job_score) for job, job_score in rows])
+
+    # Otherwise (refresh still queued, or not a job seeker) score live.
+    # Only jobs sharing at least one skill with the user are scored
+    await job_index.ensure_loaded(db)
+    scored = job_index.match([(s.name, s.level) for s in current_user.skills], weighted=weighted)
+    if not scored:
+        return JSONResponse([])
+
+    jobs = (await db.scalars(select_jobs().where(
+        models.Job.id.in_([job_id for job_id, _ in scored])
+    ))).all()
+    jobs_by_id = {job.id: job for job in jobs}
+
+    return JSONResponse([job_to_dict(jobs_by_id[job_id], score) for job_id, score in scored if job_id in jobs_by_id])
+
+# --- LIVE MATCHING JOBS (GET, server-sent events) ---
+# MOVED UP: Must be before /{job_id}
+@router.get("/stream")
+async def stream_matching_jobs(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: CachedUser = Depends(deps.get_current_user)
+):
+    """Push every created or updated job matching the user's skills as it is saved.
+
+    Each event is a JobResponse with the user's matchScore; event type is
+    "created" or "updated" and the id is the job id. Replaces polling
+    /recommendations for new postings.
+    """
+    # get_current_user may have used the session (user cache miss); give its
+    # connection back to the pool now instead of when the stream ends
+    await db.close()
+    if job_feed.is_full():
+        raise HTTPException(status_code=503, detail="Too many open job streams, try again later",
+                            headers={"Retry-After": "5"})
+
+    async def events():
+        # Subscribed here, not before: the cleanup must run on the same generator
+        subscription = job_feed.subscribe(current_user)
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                frame = await subscription.get(config.JOB_FEED_HEARTBEAT_SECONDS)
+                yield frame if frame is not None else b": keep-alive\n\n"
+        finally:
+            job_feed.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Don't let nginx buffer the stream
+        "X-Accel-Buffering": "no",
+    })
 
 # --- READ ONE (GET) ---
 # This catches everything else, so it must be last among GET requests
 @router.get("/{job_id}", response_model=schemas.JobResponse)
-def read_job(job_id: int, db: Session = Depends(deps.get_db)):
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+async def read_job(job_id: int, request: Request, db: AsyncSession = Depends(deps.get_db)):
+    async def build_job():
+        job = await db.scalar(select_jobs().where(models.Job.id == job_id))
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job_to_dict(job)
+
+    return await job_response_cache.respond(request, build_job)
+
+# --- CANDIDATES FOR A JOB (GET) ---
+@router.get("/{job_id}/candidates", response_model=List[schemas.CandidateMatchResponse])
+async def get_job_candidates(
+    job_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    min_score: int = Query(MATCH_THRESHOLD, ge=0, le=100),
+    weighted: bool = Query(False, description="Weight each matched skill by the candidate's level (0-100)"),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: CachedUser = Depends(deps.get_current_recruiter)
+):
+    job = await db.scalar(select_jobs().where(models.Job.id == job_id))
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    return schemas.JobResponse(
-        id=job.id,
-        title=job.title,
-        company=job.company,
-        location=job.location,
-        type=job.type,
-        salary_range=job.salary_range,
-        requiredSkills=job.required_skills.split(",") if job.required_skills else [],
-        description=job.description,
-        postedDate=job.posted_date,
-        matchScore=0
-    )
+
+    # Only job seekers sharing at least one skill with the job are scored
+    await candidate_index.ensure_loaded(db)
+    ranked = candidate_index.top_candidates([s.normalized_name for s in job.skills], limit, min_score, weighted)
+    if not ranked:
+        return JSONResponse([])
+
+    users = (await db.scalars(select(models.User).options(selectinload(models.User.skills)).where(
+        models.User.id.in_([user_id for user_id, _ in ranked])
+    ))).all()
+    users_by_id = {user.id: user for user in users}
+
+    results = []
+    for user_id, score in ranked:
+        user = users_by_id.get(user_id)
+        if user is None:
+            continue
+        results.append({
+            "id": user.id,
+            "name": user.full_name,
+            "email": user.email,
+            "skills": [s.name for s in user.skills],
+            "matchScore": score
+        })
+    return JSONResponse(results)
 
 # --- UPDATE (PUT) ---
 @router.put("/{job_id}", response_model=schemas.JobResponse)
-def update_job(
-    job_id: int, 
-    job_update: schemas.JobCreate, 
-    db: Session = Depends(deps.get_db)
+async def update_job(
+    job_id: int,
+    job_update: schemas.JobCreate,
+    db: AsyncSession = Depends(deps.get_db)
 ):
-    db_job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    db_job = await db.scalar(select_jobs().where(models.Job.id == job_id))
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    
+
     db_job.title = job_update.title
     db_job.company = job_update.company
     db_job.location = job_update.location
@@ -139,31 +282,33 @@ def update_job(
     db_job.salary_range = job_update.salary_range
     db_job.description = job_update.description
     db_job.required_skills = job_update.required_skills
+    db_job.skills = job_skill_rows(job_update.required_skills)
     db_job.posted_date = job_update.posted_date
 
-    db.commit()
-    db.refresh(db_job)
-    
-    return schemas.JobResponse(
-        id=db_job.id,
-        title=db_job.title,
-        company=db_job.company,
-        location=db_job.location,
-        type=db_job.type,
-        salary_range=db_job.salary_range,
-        requiredSkills=db_job.required_skills.split(",") if db_job.required_skills else [],
-        description=db_job.description,
-        postedDate=db_job.posted_date,
-        matchScore=0
-    )
+    await log_changes(db, JOB, [db_job.id])
+    await db.commit()
+    skills = [s.normalized_name for s in db_job.skills]
+    job_index.add_job(db_job.id, skills)
+    job_text_index.add_job(db_job.id, db_job.title, db_job.required_skills, db_job.description)
+    await job_response_cache.invalidate()
+    match_refresher.enqueue_jobs([db_job.id])
+    job = job_to_dict(db_job)
+    await job_feed.publish("updated", job, skills)
+
+    return JSONResponse(job)
 
 # --- DELETE (DELETE) ---
 @router.delete("/{job_id}")
-def delete_job(job_id: int, db: Session = Depends(deps.get_db)):
-    db_job = db.query(models.Job).filter(models.Job.id == job_id).first()
+async def delete_job(job_id: int, db: AsyncSession = Depends(deps.get_db)):
+    db_job = await db.scalar(select_jobs().where(models.Job.id == job_id))
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    db.delete(db_job)
-    db.commit()
-    return {"message": "Job deleted successfully"}
\ No newline at end of file
+
+    await db.delete(db_job)
+    await log_changes(db, JOB, [job_id])
+    await db.commit()
+    job_index.remove_job(job_id)
+    job_text_index.remove_job(job_id)
+    await job_response_cache.invalidate()
+    match_refresher.enqueue_jobs([job_id])
+    return {"message": "Job deleted successfully"}
@@ -1,121 +1,380 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from .. import schemas
-import io
-import pypdf
-import docx
-from typing import List
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import zipfile
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.formparsers import MultiPartParser
+from .. import models, schemas, config, deps
+from ..resume_analysis import DocumentSource, ResumeError, SUPPORTED_EXTENSIONS, analyze_document, check_format
+from ..resume_cache import ResumeCache
+from ..serialization import JSONResponse, job_to_dict
+from ..text_index import job_text_index
+from ..user_cache import CachedUser
+from ..workers import BoundedPool
 
 router = APIRouter(prefix="/resume", tags=["Resume Analysis"])
 
-# --- CONSTANTS FOR ANALYSIS ---
-# In a real ML app, these would come from a database or NLP model
-high_value_keywords = ["Python", "Java", "React", "AWS", "Docker", "Kubernetes", "Machine Learning", "CI/CD", "SQL", "FastAPI"]
-soft_skills = ["Leadership", "Communication", "Problem Solving", "Agile", "Teamwork"]
-action_verbs = ["Spearheaded", "Developed", "Orchestrated", "Engineered", "Managed", "Led"]
-
-def extract_text_from_pdf(file_file) -> str:
-    pdf_reader = pypdf.PdfReader(file_file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
-    return text
-
-def extract_text_from_docx(file_file) -> str:
-    doc = docx.Document(file_file)
-    text = ""
-    for para in doc.paragraphs:
-        text += para.text + "\n"
-    return text
-
-def calculate_section_score(text: str, keywords: List[str]) -> int:
-    found = sum(1 for k in keywords if k.lower() in text.lower())
-    if not found: return 50
-    # Simple curve: 5 keywords = 100%
-    return min(50 + (found * 10), 100)
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Multipart framing allowed per file on top of the size limits (boundary, part headers)
+MULTIPART_OVERHEAD = 16 * 1024
+
+# Parsing is CPU-bound, so it runs in worker processes instead of on the event loop
+resume_pool = BoundedPool(
+    "resume",
+    workers=config.RESUME_WORKERS,
+    max_pending=config.RESUME_MAX_PENDING,
+    timeout=config.RESUME_PARSE_TIMEOUT,
+)
+
+# Re-uploads of the same file skip parsing entirely
+resume_cache = ResumeCache(
+    max_entries=config.RESUME_CACHE_ENTRIES,
+    max_bytes=config.RESUME_CACHE_MAX_BYTES,
+    db_path=config.RESUME_CACHE_DB,
+    max_db_entries=config.RESUME_CACHE_DB_ENTRIES,
+)
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the upload limit of {config.RESUME_MAX_UPLOAD_BYTES} bytes.",
+    )
+
+class UploadLimitMiddleware:
+    """413 for a resume upload whose request body is larger than its route allows.
+
+    Runs before the form is parsed, so an oversized upload is never spooled:
+    rejected from Content-Length when the client sends one, otherwise as
+    soon as the body chunks received add up past the limit.
+    """
+
+    def __init__(self, app, prefix: str = ""):
+        self.app = app
+        self.prefix = prefix
+
+    def limit(self, path: str) -> Optional[int]:
+        if path in (f"{self.prefix}/resume/analyze", f"{self.prefix}/resume/match"):
+            return config.RESUME_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD
+        if path == f"{self.prefix}/resume/analyze/batch":
+            return config.RESUME_BATCH_MAX_BYTES + MULTIPART_OVERHEAD * config.RESUME_BATCH_MAX_FILES
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limit(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        detail = f"Request body exceeds the upload limit of {limit} bytes."
+        length = Headers(scope=scope).get("content-length", "")
+        if length.isdigit() and int(length) > limit:
+            response = JSONResponse({"detail": detail}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_within_limit():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised while FastAPI reads the form, which turns it into the response
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+            return message
+
+        await self.app(scope, receive_within_limit, send)
+
+async def spool_upload(file: UploadFile) -> Tuple[DocumentSource, str, Optional[str]]:
+    """Hash an upload where Starlette spooled it and return what a parse worker reads.
+
+    Returns (source, sha256 hex, temp path or None). An upload still in
+    Starlette's in-memory spool is handed over as bytes. One that rolled
+    over to disk sits in an unnamed temp file that worker processes can't
+    open, so it is copied chunk by chunk to a named temp file, hashing as it
+    goes; the caller removes that file. Stops with 413 as soon as the size
+    limit is crossed.
+    """
+    if file.size is not None and file.size > config.RESUME_MAX_UPLOAD_BYTES:
+        raise _too_large()
+
+    await file.seek(0)
+    if file.size is not None and file.size <= MultiPartParser.spool_max_size:
+        data = await file.read(config.RESUME_MAX_UPLOAD_BYTES + 1)
+        if len(data) > config.RESUME_MAX_UPLOAD_BYTES:
+            raise _too_large()
+        return data, hashlib.sha256(data).hexdigest(), None
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=os.path.splitext(file.filename or "")[1])
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > config.RESUME_MAX_UPLOAD_BYTES:
+                    raise _too_large()
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest(), path
+
+async def process_spooled(filename: str, source: DocumentSource, sha256_hex: str) -> Tuple[str, dict]:
+    """Extract and analyze an already spooled upload, going through the cache first.
+
+    Returns (text, analysis).
+    """
+    key = resume_cache.key(sha256_hex)
+    cached = await resume_cache.get(key)
+    if cached is not None:
+        return cached.text, cached.analysis
+    # Workers open large spooled files themselves instead of receiving the bytes
+    text, analysis = await resume_pool.run(analyze_document, filename, source)
+    await resume_cache.put(key, text, analysis)
+    return text, analysis
+
+async def analyze_spooled(filename: str, source: DocumentSource, sha256_hex: str) -> dict:
+    _, analysis = await process_spooled(filename, source, sha256_hex)
+    return analysis
+
+async def process_upload(file: UploadFile) -> Tuple[str, dict]:
+    """Validate, spool and process a single upload; errors become HTTP errors."""
+    filename = file.filename or ""
+    try:
+        check_format(filename)
+    except ResumeError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    source, sha256_hex, path = await spool_upload(file)
+    try:
+        return await process_spooled(filename, source, sha256_hex)
+    except ResumeError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    finally:
+        if path is not None:
+            os.unlink(path)
 
 @router.post("/analyze", response_model=schemas.ResumeAnalysisResponse)
 async def analyze_resume(file: UploadFile = File(...)):
-    # 1. READ FILE CONTENT
-    content = await file.read()
-    file_obj = io.BytesIO(content)
-    text = ""
+    _, analysis = await process_upload(file)
+    return analysis
+
+# --- MATCH AGAINST THE JOB CATALOG ---
+
+@router.post("/match", response_model=List[schemas.JobResponse])
+async def match_resume(
+    file: UploadFile = File(...),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(deps.get_db)
+):
+    """Jobs whose title, skills and description best match the resume text.
+
+    matchScore is the TF-IDF cosine similarity as a percentage.
+    """
+    text, _ = await process_upload(file)
+    await job_text_index.ensure_loaded(db)
+    ranked = await run_in_threadpool(job_text_index.search, text, limit)
+    if not ranked:
+        return JSONResponse([])
+
+    jobs = (await db.scalars(
+        select(models.Job).options(selectinload(models.Job.skills))
+        .where(models.Job.id.in_([job_id for job_id, _ in ranked]))
+    )).all()
+    jobs_by_id = {job.id: job for job in jobs}
+    return JSONResponse([
+        job_to_dict(jobs_by_id[job_id], round(similarity * 100))
+        for job_id, similarity in ranked if job_id in jobs_by_id
+    ])
+
+# --- BATCH ANALYSIS (recruiters) ---
+
+def _batch_error(filename: str, status_code: int, detail: str) -> schemas.ResumeBatchItem:
+    return schemas.ResumeBatchItem(filename=filename, status=status_code, error=detail)
+
+class BatchLimits:
+    """Documents and bytes a batch may still add (RESUME_BATCH_MAX_FILES / RESUME_BATCH_MAX_BYTES).
+
+    Charged as files are spooled and zip members extracted, so an oversized
+    batch is refused with 413 before the rest of it is unpacked.
+    """
+
+    def __init__(self):
+        self.files = config.RESUME_BATCH_MAX_FILES
+        self.bytes = config.RESUME_BATCH_MAX_BYTES
+
+    def add_files(self, count: int = 1):
+        if count > self.files:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {config.RESUME_BATCH_MAX_FILES} documents per batch.",
+            )
+        self.files -= count
 
+    def add_bytes(self, size: int):
+        if size > self.bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch documents exceed {config.RESUME_BATCH_MAX_BYTES} bytes in total.",
+            )
+        self.bytes -= size
+
+def expand_zip(
+    source: DocumentSource,
+    archive_name: str,
+    limits: BatchLimits
+) -> Tuple[List[Tuple[str, str, str]], List[schemas.ResumeBatchItem]]:
+    """Extract the PDF/DOCX members of a zip to temp files.
+
+    Returns ([(member name, path, sha256 hex)], [error items]). Members are
+    copied in chunks with the same per-file size limit as direct uploads and
+    charged to limits as they go; when the batch limits are exceeded, the
+    files extracted so far are removed and the 413 HTTPException propagates.
+    """
+    documents, errors = [], []
     try:
-        if file.filename.endswith(".pdf"):
-            text = extract_text_from_pdf(file_obj)
-        elif file.filename.endswith(".docx"):
-            text = extract_text_from_docx(file_obj)
-        else:
-            raise HTTPException(status_code=400, detail="Invalid format. Use PDF or DOCX.")
-    except Exception as e:
-        print(f"Error parsing file: {e}")
-        raise HTTPException(status_code=500, detail="Could not parse file content.")
-
-    if len(text.strip()) < 50:
-        raise HTTPException(status_code=400, detail="Resume content is too short or unreadable.")
-
-    # 2. PERFORM ANALYSIS (Rule-Based Heuristics)
-    
-    # Detect Keywords
-    present_keywords = [kw for kw in high_value_keywords if kw.lower() in text.lower()]
-    missing_keywords = [kw for kw in high_value_keywords if kw.lower() not in text.lower()]
-    
-    # Calculate Scores
-    tech_score = calculate_section_score(text, high_value_keywords)
-    format_score = 90 if len(text.split('\n')) > 20 else 60 # Simple line check
-    impact_score = calculate_section_score(text, action_verbs)
-    
-    overall_score = int((tech_score + format_score + impact_score) / 3)
-
-    # Generate Dynamic Feedback
-    strengths = []
-    if len(present_keywords) >= 3:
-        strengths.append({
-            "title": "Strong Technical Base", 
-            "description": f"Found key skills: {', '.join(present_keywords[:3])}", 
-            "type": "strength"
-        })
-    if impact_score > 80:
-        strengths.append({
-            "title": "Action-Oriented Language", 
-            "description": "Good use of strong action verbs (e.g., Led, Engineered).", 
-            "type": "strength"
-        })
-
-    improvements = []
-    if len(missing_keywords) > 0:
-        improvements.append({
-            "title": "Missing High-Value Skills",
-            "description": f"Consider adding: {', '.join(missing_keywords[:3])}",
-            "type": "improvement",
-            "severity": "high"
-        })
-    if impact_score < 70:
-        improvements.append({
-            "title": "Weak Impact Verbs",
-            "description": "Use words like 'Spearheaded' or 'Orchestrated' instead of 'Worked on'.",
-            "type": "improvement",
-            "severity": "medium"
-        })
-
-    # 3. RETURN STRUCTURED RESPONSE
-    return {
-        "overallScore": overall_score,
-        "atsCompatibility": 85, # Placeholder for complex regex logic
-        "contentQuality": impact_score,
-        "formatting": format_score,
-        "keywordOptimization": tech_score,
-        "impactScore": impact_score,
-        "sections": [
-            {"section": "Contact Information", "score": 100, "status": "excellent", "feedback": "detected"},
-            {"section": "Skills", "score": tech_score, "status": "good" if tech_score > 75 else "average", "feedback": f"{len(present_keywords)} keywords found"},
-            {"section": "Work Experience", "score": impact_score, "status": "good" if impact_score > 75 else "average", "feedback": "Action verbs analyzed"},
-        ],
-        "strengths": strengths,
-        "improvements": improvements,
-        "keywords": {
-            "present": present_keywords,
-            "missing": missing_keywords,
-            "recommended": ["System Design", "Scalability"] # specific recommendations
-        }
-    }
\ No newline at end of file
+        archive = zipfile.ZipFile(source)
+    except zipfile.BadZipFile:
+        return documents, [_batch_error(archive_name, 400, "Not a valid zip archive.")]
+
+    with archive:
+        members = []
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+                continue
+            if not name.endswith(SUPPORTED_EXTENSIONS):
+                errors.append(_batch_error(name, 400, "Invalid format. Use PDF or DOCX."))
+            elif info.file_size > config.RESUME_MAX_UPLOAD_BYTES:
+                errors.append(_batch_error(name, 413, f"File exceeds the upload limit of {config.RESUME_MAX_UPLOAD_BYTES} bytes."))
+            else:
+                members.append(info)
+        # The central directory gives the count up front: refuse before extracting anything
+        limits.add_files(len(members))
+
+        try:
+            for info in members:
+                name = info.filename
+                digest = hashlib.sha256()
+                fd, member_path = tempfile.mkstemp(prefix="resume-", suffix=os.path.splitext(name)[1])
+                try:
+                    with os.fdopen(fd, "wb") as out, archive.open(info) as member:
+                        # Read at most limit + 1 bytes so a lying header can't inflate past the cap
+                        remaining = config.RESUME_MAX_UPLOAD_BYTES + 1
+                        while remaining > 0:
+                            chunk = member.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                            if not chunk:
+                                break
+                            remaining -= len(chunk)
+                            limits.add_bytes(len(chunk))
+                            digest.update(chunk)
+                            out.write(chunk)
+                except BaseException:
+                    os.unlink(member_path)
+                    raise
+                if remaining <= 0:
+                    os.unlink(member_path)
+                    errors.append(_batch_error(name, 413, f"File exceeds the upload limit of {config.RESUME_MAX_UPLOAD_BYTES} bytes."))
+                    continue
+                documents.append((name, member_path, digest.hexdigest()))
+        except BaseException:
+            for _, member_path, _ in documents:
+                os.unlink(member_path)
+            raise
+    return documents, errors
+
+@router.post("/analyze/batch")
+async def analyze_resume_batch(
+    files: List[UploadFile] = File(...),
+    current_user: CachedUser = Depends(deps.get_current_recruiter)
+):
+    """Analyze many PDF/DOCX files (or zip archives of them) in parallel.
+
+    Streams one schemas.ResumeBatchItem per file as NDJSON, in completion
+    order. A file that fails only produces an error line for itself.
+    """
+    # (filename, source, sha256 hex, temp path to remove or None)
+    documents: List[Tuple[str, DocumentSource, str, Optional[str]]] = []
+    errors: List[schemas.ResumeBatchItem] = []
+    limits = BatchLimits()
+    try:
+        for file in files:
+            filename = file.filename or ""
+            if filename.endswith(".zip"):
+                if file.size is not None and file.size > config.RESUME_MAX_UPLOAD_BYTES:
+                    errors.append(_batch_error(filename, 413, _too_large().detail))
+                    continue
+                # Read where Starlette spooled it; only the members are extracted
+                await file.seek(0)
+                members, member_errors = await run_in_threadpool(expand_zip, file.file, filename, limits)
+                documents.extend((name, path, sha256_hex, path) for name, path, sha256_hex in members)
+                errors.extend(member_errors)
+            elif filename.endswith(SUPPORTED_EXTENSIONS):
+                try:
+                    source, sha256_hex, path = await spool_upload(file)
+                except HTTPException as e:
+                    errors.append(_batch_error(filename, e.status_code, e.detail))
+                    continue
+                documents.append((filename, source, sha256_hex, path))
+                limits.add_files()
+                limits.add_bytes(file.size if file.size is not None else os.path.getsize(path))
+            else:
+                errors.append(_batch_error(filename, 400, "Invalid format. Use PDF or DOCX."))
+    except BaseException:
+        for _, _, _, path in documents:
+            if path is not None:
+                os.unlink(path)
+        raise
+
+    # Don't queue more than the pool can run at once, or the batch would trip its 503 limit
+    slots = asyncio.Semaphore(max(config.RESUME_WORKERS, 1))
+
+    async def analyze_one(
+        filename: str, source: DocumentSource, sha256_hex: str, path: Optional[str]
+    ) -> schemas.ResumeBatchItem:
+        try:
+            async with slots:
+                analysis = await analyze_spooled(filename, source, sha256_hex)
+            return schemas.ResumeBatchItem(filename=filename, status=200, result=analysis)
+        except ResumeError as e:
+            return _batch_error(filename, e.status_code, e.detail)
+        except HTTPException as e:
+            return _batch_error(filename, e.status_code, e.detail)
+        except Exception:
+            logger.exception("Error analyzing %s", filename)
+            return _batch_error(filename, 500, "Could not analyze file.")
+        finally:
+            if path is not None:
+                os.unlink(path)
+
+    async def results():
+        tasks = [asyncio.ensure_future(analyze_one(*doc)) for doc in documents]
+        try:
+            for item in errors:
+                yield item.model_dump_json() + "\n"
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                yield item.model_dump_json() + "\n"
+        finally:
+            # Client went away: stop waiting, the tasks still clean up their files
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
@@ -1,43 +1,156 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List
 from .. import models, schemas, deps
+from ..change_log import USER, log_changes
+from ..config import SKILLS_MAX_PER_USER
+from ..database import IS_SQLITE
+from ..job_feed import job_feed
+from ..match_store import match_refresher
+from ..serialization import JSONResponse, skill_to_dict
+from ..skill_index import MATCH_THRESHOLD, candidate_index, job_index
+from ..user_cache import CachedSkill, CachedUser, user_cache
 
 router = APIRouter(prefix="/skills", tags=["Skills"])
 
+# Skill names are unique per user regardless of case: uq_skills_user_id_lower_name
+_SKILL_KEY = [models.Skill.user_id, func.lower(models.Skill.name)]
+
+
+def upsert_skills(user_id: int, skills: List[schemas.SkillCreate]):
+    """INSERT ... ON CONFLICT (user_id, lower(name)) DO UPDATE for a batch of skills."""
+    insert = sqlite_insert if IS_SQLITE else pg_insert
+    stmt = insert(models.Skill).values([{**skill.model_dump(), "user_id": user_id} for skill in skills])
+    return stmt.on_conflict_do_update(index_elements=_SKILL_KEY, set_={
+        "name": stmt.excluded.name, "level": stmt.excluded.level, "category": stmt.excluded.category,
+    })
+
+
+def normalized_skills(skills: List[schemas.SkillCreate]) -> Dict[str, schemas.SkillCreate]:
+    """Submitted skills keyed by lower-cased name (the last duplicate wins), names stripped."""
+    by_key = {}
+    for skill in skills:
+        name = skill.name.strip()
+        if not name:
+            raise HTTPException(status_code=400, detail="Skill name must not be empty")
+        by_key[name.lower()] = skill.model_copy(update={"name": name})
+    return by_key
+
 @router.get("/", response_model=List[schemas.SkillResponse])
-def read_skills(
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user)
+async def read_skills(
+    current_user: CachedUser = Depends(deps.get_current_user)
+):
+    return JSONResponse([skill_to_dict(s) for s in current_user.skills])
+
+@router.get("/gap", response_model=schemas.SkillGapResponse)
+async def get_skill_gap(
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: CachedUser = Depends(deps.get_current_user)
 ):
-    return current_user.skills
+    """Missing skills ranked by how many more jobs each would lift over the match threshold."""
+    await job_index.ensure_loaded(db)
+    matching, gaps = job_index.skill_gap([s.name for s in current_user.skills], MATCH_THRESHOLD, limit)
+
+    # The index only knows normalized names; show them as jobs spell them
+    spellings = dict((await db.execute(
+        select(models.JobSkill.normalized_name, func.min(models.JobSkill.name))
+        .where(models.JobSkill.normalized_name.in_([name for name, *_ in gaps]))
+        .group_by(models.JobSkill.normalized_name)
+    )).all()) if gaps else {}
+    return JSONResponse({
+        "threshold": MATCH_THRESHOLD,
+        "matchingJobs": matching,
+        "skills": [
+            {"skill": spellings.get(name, name), "unlockedJobs": unlocked, "jobsRequiring": requiring,
+             "coOccurrence": related}
+            for name, unlocked, requiring, related in gaps
+        ],
+    })
+
+@router.put("/", response_model=List[schemas.SkillResponse])
+async def replace_skills(
+    skills: List[schemas.SkillCreate],
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: CachedUser = Depends(deps.get_current_user)
+):
+    """Replace the user's whole skill set: one diff, one transaction.
+
+    Skills missing from the body are deleted, new or changed ones are
+    upserted in a single statement; unchanged rows are left alone.
+    """
+    if len(skills) > SKILLS_MAX_PER_USER:
+        raise HTTPException(status_code=400, detail=f"At most {SKILLS_MAX_PER_USER} skills per profile")
+    submitted = normalized_skills(skills)
+
+    stored = {
+        name.lower(): CachedSkill(id, name, level, category, current_user.id)
+        for id, name, level, category in (await db.execute(
+            select(models.Skill.id, models.Skill.name, models.Skill.level, models.Skill.category)
+            .where(models.Skill.user_id == current_user.id)
+        )).all()
+    }
+    removed = [row.id for key, row in stored.items() if key not in submitted]
+    changed = [
+        skill for key, skill in submitted.items()
+        if key not in stored or stored[key][1:4] != (skill.name, skill.level, skill.category)
+    ]
+    if not removed and not changed:
+        return JSONResponse([skill_to_dict(s) for s in stored.values()])
+
+    if removed:
+        await db.execute(delete(models.Skill).where(models.Skill.id.in_(removed)))
+    if changed:
+        await db.execute(upsert_skills(current_user.id, changed))
+    await log_changes(db, USER, [current_user.id])
+    await db.commit()
+    user = await user_cache.refresh(db, current_user.id)
+    candidate_index.sync_user(user)
+    job_feed.sync_user(user)
+    match_refresher.enqueue_user(current_user.id)
+    return JSONResponse([skill_to_dict(s) for s in user.skills])
 
 @router.post("/", response_model=schemas.SkillResponse)
-def create_skill(
+async def create_skill(
     skill: schemas.SkillCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user)
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: CachedUser = Depends(deps.get_current_user)
 ):
-    db_skill = models.Skill(**skill.dict(), user_id=current_user.id)
-    db.add(db_skill)
-    db.commit()
-    db.refresh(db_skill)
-    return db_skill
+    # Adding a skill the user already has (in any case) updates it
+    skill = next(iter(normalized_skills([skill]).values()))
+    db_skill = await db.scalar(
+        select(models.Skill).from_statement(upsert_skills(current_user.id, [skill]).returning(models.Skill))
+    )
+    await log_changes(db, USER, [current_user.id])
+    await db.commit()
+    user = await user_cache.refresh(db, current_user.id)
+    candidate_index.sync_user(user)
+    job_feed.sync_user(user)
+    match_refresher.enqueue_user(current_user.id)
+    return JSONResponse(skill_to_dict(db_skill))
 
 @router.delete("/{skill_name}")
-def delete_skill(
+async def delete_skill(
     skill_name: str,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user)
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: CachedUser = Depends(deps.get_current_user)
 ):
-    skill = db.query(models.Skill).filter(
+    skill = await db.scalar(select(models.Skill).where(
         models.Skill.user_id == current_user.id,
-        models.Skill.name == skill_name
-    ).first()
+        func.lower(models.Skill.name) == skill_name.strip().lower()
+    ).limit(1))
     
     if not skill:
         raise HTTPException(status_code=404, detail="Skill not found")
         
-    db.delete(skill)
-    db.commit()
-    return {"message": "Skill deleted"}
\ No newline at end of file
+    await db.delete(skill)
+    await log_changes(db, USER, [current_user.id])
+    await db.commit()
+    user = await user_cache.refresh(db, current_user.id)
+    candidate_index.sync_user(user)
+    job_feed.sync_user(user)
+    match_refresher.enqueue_user(current_user.id)
+    return {"message": "Skill deleted"}
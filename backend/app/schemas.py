@@ -42,6 +42,17 @@ class SkillResponse(SkillBase):
     class Config:
         from_attributes = True
 
+class SkillGap(BaseModel):
+    skill: str
+    unlockedJobs: int  # Jobs that would reach the match threshold with this skill added
+    jobsRequiring: int
+    coOccurrence: int  # Jobs requiring it together with one of the user's skills (summed per skill)
+
+class SkillGapResponse(BaseModel):
+    threshold: int
+    matchingJobs: int
+    skills: List[SkillGap]
+
 # --- Job Schemas ---
 
 # NEW: Add this class to allow creating jobs
@@ -70,6 +81,32 @@ class JobResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CandidateMatchResponse(BaseModel):
+    id: int
+    name: str
+    email: str
+    skills: List[str]
+    matchScore: int
+
+class JobSearchPage(BaseModel):
+    jobs: List[JobResponse]
+    nextOffset: Optional[int] = None  # None when this is the last page
+
+class JobImportError(BaseModel):
+    line: int  # 1-based line (CSV header is line 1)
+    error: str
+
+class JobImportReport(BaseModel):
+    imported: int
+    failed: int
+    seconds: float
+    rowsPerSecond: float
+    errors: List[JobImportError]  # Capped; "failed" has the full count
+
+class JobPage(BaseModel):
+    jobs: List[JobResponse]
+    nextCursor: Optional[int] = None  # Pass back as ?cursor= for the next page, None on the last page
+
 
 
 # --- Resume Analysis Schemas ---
@@ -100,4 +137,11 @@ class ResumeAnalysisResponse(BaseModel):
     sections: List[ResumeSection]
     strengths: List[ResumeFeedbackItem]
     improvements: List[ResumeFeedbackItem]
-    keywords: ResumeKeywords
\ No newline at end of file
+    keywords: ResumeKeywords
+
+class ResumeBatchItem(BaseModel):
+    # One NDJSON line of /resume/analyze/batch
+    filename: str
+    status: int  # HTTP-style status for this file, 200 on success
+    result: Optional[ResumeAnalysisResponse] = None
+    error: Optional[str] = None
@@ -0,0 +1,155 @@
+import numpy as np
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# All names passed in here are expected to be normalized already
+# (see skill_index.normalize_skill).
+
+
+def skill_weight(level: Optional[int], weighted: bool) -> float:
+    # Unweighted mode counts every matched skill as 1, like the original percentage
+    if not weighted:
+        return 1.0
+    return (100 if level is None else level) / 100
+
+
+class SkillVocabulary:
+    """Shared skill name -> column id mapping for all skill vectors."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, name: str) -> int:
+        skill_id = self._ids.get(name)
+        if skill_id is None:
+            skill_id = self._ids[name] = len(self._ids)
+            self._names.append(name)
+        return skill_id
+
+    def get(self, name: str) -> Optional[int]:
+        return self._ids.get(name)
+
+    def name(self, skill_id: int) -> str:
+        return self._names[skill_id]
+
+
+def gather(values: np.ndarray, indptr: np.ndarray, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate the CSR slices values[indptr[i]:indptr[i + 1]] of every i in slots.
+
+    Returns (the gathered values, the length of each slice).
+    """
+    starts = indptr[slots]
+    counts = indptr[slots + 1] - starts
+    total = int(counts.sum())
+    # Flat positions of all gathered slices
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+    return values[offsets + np.arange(total)], counts
+
+
+class JobSkillMatrix:
+    """Sparse job x skill matrix stored column-wise (skill -> job rows).
+
+    Scoring a user only gathers the columns of the user's skills and sums
+    them per job with one bincount, so the whole catalog is scored in a
+    single vectorized pass that only touches jobs sharing a skill. The
+    row-wise copy (job -> skills) serves the skill-gap analysis.
+    """
+
+    def __init__(self, job_skills: Dict[int, Iterable[int]], vocab_size: int):
+        self.job_ids = np.array(sorted(job_skills), dtype=np.int64)
+        columns = [np.fromiter(job_skills[job_id], dtype=np.int64) for job_id in self.job_ids.tolist()]
+        lengths = np.array([len(c) for c in columns], dtype=np.int64)
+        self.totals = lengths.astype(np.float64)
+
+        rows = np.repeat(np.arange(len(self.job_ids), dtype=np.int64), lengths)
+        cols = np.concatenate(columns) if columns else np.empty(0, dtype=np.int64)
+        order = np.argsort(cols, kind="stable")
+        self._rows = rows[order]
+        self._indptr = np.zeros(vocab_size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=vocab_size), out=self._indptr[1:])
+        self._cols = cols
+        self._row_indptr = np.zeros(len(self.job_ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self._row_indptr[1:])
+
+    def matched(self, skill_ids: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Sum of the matched skill weights of every job for one skill vector."""
+        rows, counts = gather(self._rows, self._indptr, skill_ids)
+        if not len(rows):
+            return np.zeros(len(self.job_ids))
+        return np.bincount(rows, weights=np.repeat(weights, counts), minlength=len(self.job_ids))
+
+    def score(self, skill_ids: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Match percentage (0-100, float) of every job for one skill vector."""
+        return self.matched(skill_ids, weights) / self.totals * 100
+
+    def unlock_counts(self, skill_ids: np.ndarray, threshold: int) -> Tuple[int, np.ndarray]:
+        """How many more jobs would reach threshold if each skill were added.
+
+        skill_ids are the user's skills (unweighted). Returns (jobs at or
+        above threshold now, count per skill id); the user's own skills
+        count 0. A job is unlocked by exactly those of its skills the user
+        lacks when one more match lifts it over the threshold.
+        """
+        matched = self.matched(skill_ids, np.ones(len(skill_ids)))
+        # Truncated like SkillIndex.match compares scores
+        now = (matched / self.totals * 100).astype(np.int64) >= threshold
+        after = ((matched + 1) / self.totals * 100).astype(np.int64) >= threshold
+        near = np.flatnonzero(after & ~now)
+        cols, _ = gather(self._cols, self._row_indptr, near)
+        counts = np.bincount(cols, minlength=len(self._indptr) - 1)
+        counts[skill_ids] = 0
+        return int(now.sum()), counts
+
+    def frequencies(self) -> np.ndarray:
+        """Jobs requiring each skill id."""
+        return np.diff(self._indptr)
+
+    def pair_counts(self, chunk_rows: int = 100_000) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Co-occurrence as (skill a, skill b, jobs requiring both) arrays, pairs a != b.
+
+        Yielded per chunk of jobs (a pair can appear in several chunks), which
+        bounds the memory used by the k*k pairs of each job.
+        """
+        vocab = len(self._indptr) - 1
+        for first in range(0, len(self.job_ids), chunk_rows):
+            rows = np.arange(first, min(first + chunk_rows, len(self.job_ids)))
+            cols, lengths = gather(self._cols, self._row_indptr, rows)
+            # Pair each entry with every entry of its own row
+            left = np.repeat(cols, np.repeat(lengths, lengths))
+            right, _ = gather(self._cols, self._row_indptr, np.repeat(rows, lengths))
+            keys = left * vocab + right
+            keys, counts = np.unique(keys[left != right], return_counts=True)
+            yield keys // vocab, keys % vocab, counts
+
+
+def score_candidates(
+    required: Iterable[str],
+    candidates: Dict[int, Iterable[Tuple[str, Optional[int]]]],
+    weighted: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Score many candidates against one job's required skills in a batch.
+
+    candidates maps user id -> (skill name, level) pairs. Returns parallel
+    arrays of user ids and match percentages (0-100, float).
+    """
+    columns = {name: i for i, name in enumerate(dict.fromkeys(required))}
+    user_ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+    if not columns or not len(user_ids):
+        return user_ids, np.zeros(len(user_ids))
+
+    rows, weights = [], []
+    for row, skills in enumerate(candidates.values()):
+        # A skill listed twice only counts once, at its best level
+        best: Dict[int, float] = {}
+        for name, level in skills:
+            col = columns.get(name)
+            if col is not None:
+                best[col] = max(best.get(col, 0.0), skill_weight(level, weighted))
+        rows.extend([row] * len(best))
+        weights.extend(best.values())
+
+    matched = np.bincount(np.array(rows, dtype=np.int64), weights=np.array(weights), minlength=len(user_ids))
+    return user_ids, matched / len(columns) * 100
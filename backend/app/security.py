@@ -1,7 +1,10 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from . import config
+from .metrics import span
+from .workers import BoundedPool
 
 # SECRET_KEY should be in env variables in production
 # SECRET_KEY generation command: openssl rand -hex 32
@@ -9,13 +12,34 @@ SECRET_KEY= "c2ab80faa5f7b437b9a9cacf5e9709633247f841d65400e9621821b2c463baf1"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.BCRYPT_ROUNDS)
+
+# bcrypt is deliberately slow; run it in worker processes so logins don't hold the GIL
+password_pool = BoundedPool(
+    "password",
+    workers=config.PASSWORD_HASH_WORKERS,
+    max_pending=config.PASSWORD_HASH_MAX_PENDING,
+    timeout=config.PASSWORD_HASH_TIMEOUT,
+)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    with span("bcrypt_hash"):
+        return pwd_context.hash(password)
+
+def verify_and_update_password(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    # Returns (valid, new_hash); new_hash is set when needs_update() says the stored
+    # hash uses an outdated scheme or cost (e.g. after changing BCRYPT_ROUNDS)
+    with span("bcrypt_verify"):
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+
+async def hash_password_async(password) -> str:
+    return await password_pool.run(get_password_hash, password)
+
+async def verify_password_async(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    return await password_pool.run(verify_and_update_password, plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
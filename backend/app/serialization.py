@@ -0,0 +1,55 @@
+from typing import Any
+
+import orjson
+from fastapi import Response
+from . import models
+
+# Fast JSON path for the jobs and skills routers.
+#
+# Routes build plain dicts with exactly the keys their response_model
+# emits (aliases included) and return them in a JSONResponse below. FastAPI
+# passes Response objects through untouched, so rows are neither wrapped in
+# Pydantic models nor validated a second time on the way out; the
+# response_model stays on the route for the OpenAPI schema only.
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content)
+
+
+class JSONResponse(Response):
+    """orjson-rendered response. Pre-serialized bytes are sent as-is."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def job_to_dict(job: models.Job, score: int = 0) -> dict:
+    # Same shape as schemas.JobResponse serialized by alias (salary -> salary_range)
+    return {
+        "id": job.id,
+        "title": job.title,
+        "company": job.company,
+        "location": job.location,
+        "type": job.type,
+        "salary_range": job.salary_range,
+        "requiredSkills": [s.name for s in job.skills],
+        "description": job.description,
+        "postedDate": job.posted_date,
+        "matchScore": score,
+    }
+
+
+def skill_to_dict(skill) -> dict:
+    # skill: a models.Skill or user_cache.CachedSkill; same shape as schemas.SkillResponse
+    return {
+        "name": skill.name,
+        "level": skill.level,
+        "category": skill.category,
+        "id": skill.id,
+        "user_id": skill.user_id,
+    }
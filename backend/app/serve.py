@@ -0,0 +1,123 @@
+"""Pre-forking server: warm up once, then fork the workers.
+
+Usage (from backend/): python -m app.serve [--host 127.0.0.1] [--port 8000] [--workers 4] [--no-warm-indexes]
+
+`uvicorn --workers N` spawns every worker from a fresh interpreter, so each
+one re-imports the app and rebuilds the skill indexes on its first request.
+Here the parent imports the app, loads the job, candidate and text indexes
+and binds the socket once, then forks: workers serve immediately and share the
+warmed-up memory copy-on-write. Run `python -m app.migrations` first.
+POSIX only (needs os.fork).
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+from typing import Set
+
+import uvicorn
+
+from .database import SessionLocal, engine
+from .main import create_app
+from .skill_index import candidate_index, job_index
+from .text_index import job_text_index
+
+logger = logging.getLogger("app.serve")
+
+
+async def warm_up(indexes: bool):
+    if indexes:
+        async with SessionLocal() as db:
+            await job_index.ensure_loaded(db)
+            await candidate_index.ensure_loaded(db)
+            await job_text_index.ensure_loaded(db)
+    # No pooled connection (or aiosqlite thread) may be inherited by the workers
+    await engine.dispose()
+
+
+def bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, args):
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # The warmed-up indexes catch up with later writes (by any worker)
+    # through the change log on first use, so respawned workers fork from them too
+    server = uvicorn.Server(uvicorn.Config(app, log_level=args.log_level, lifespan="on"))
+    server.run(sockets=[sock])
+
+
+def fork_worker(app, sock: socket.socket, args) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 0
+    try:
+        run_worker(app, sock, args)
+    except BaseException:
+        logger.exception("Worker %d crashed", os.getpid())
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from pre-forked, warmed-up workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--no-warm-indexes", action="store_true", help="Let each worker load the in-memory indexes lazily")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    if not hasattr(os, "fork"):
+        parser.error("pre-forking needs os.fork; use uvicorn --workers on this platform")
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:     %(message)s")
+
+    app = create_app()
+    asyncio.run(warm_up(not args.no_warm_indexes))
+    sock = bind(args.host, args.port)
+    # Keep the warmed-up objects out of the cyclic GC: collections in the
+    # workers would otherwise write to (and so copy) every page they live on
+    gc.freeze()
+
+    children: Set[int] = {fork_worker(app, sock, args) for _ in range(args.workers)}
+    logger.info("Serving on %s:%d with %d pre-forked workers (parent %d)", args.host, args.port, len(children), os.getpid())
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            logger.warning("Worker %d exited with status %d, starting a new one", pid, os.waitstatus_to_exitcode(status))
+            children.add(fork_worker(app, sock, args))
+    sock.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+import heapq
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from . import models
+from .change_log import JOB, USER, ChangeCursor, latest_change
+from .scoring import JobSkillMatrix, SkillVocabulary, score_candidates, skill_weight
+
+# Jobs below this match percentage are not recommended
+MATCH_THRESHOLD = 50
+
+
+def normalize_skill(name: str) -> str:
+    return name.strip().lower()
+
+
+def parse_skills(raw: str) -> List[str]:
+    # "React, Node.js,,AWS" -> ["React", "Node.js", "AWS"]
+    if not raw:
+        return []
+    return [s.strip() for s in raw.split(",") if s.strip()]
+
+
+def job_skill_rows(raw: str) -> List[models.JobSkill]:
+    # One JobSkill per distinct skill, keeping the first spelling and the input order
+    rows = []
+    seen = set()
+    for name in parse_skills(raw):
+        normalized = normalize_skill(name)
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        rows.append(models.JobSkill(name=name, normalized_name=normalized))
+    return rows
+
+
+class SkillIndex:
+    """Inverted index of normalized skill name -> job ids.
+
+    Lets recommendations score only the jobs that share at least one skill
+    with the user instead of loading and re-splitting the whole jobs table.
+    Built lazily from the database on first use, kept up to date by the
+    job write endpoints of this process and, through the change log, of
+    the other workers. Scoring runs on a column-wise JobSkillMatrix that
+    is recompiled on the first read after a write. Per-skill job counts and
+    skill co-occurrence counts are maintained alongside for the skill-gap
+    analysis.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vocab = SkillVocabulary()
+        self._job_skills: Dict[int, FrozenSet[int]] = {}
+        self._matrix: Optional[JobSkillMatrix] = None
+        # skill id -> jobs requiring it; skill id -> other skill id -> jobs requiring both
+        self._frequency: Counter = Counter()
+        self._cooccurrence: Dict[int, Counter] = defaultdict(Counter)
+        self._changes = ChangeCursor(JOB)
+        self._loaded = False
+
+    async def ensure_loaded(self, db: AsyncSession, sync: bool = False):
+        """Load the index, or apply jobs changed by any process since the last check.
+
+        Checks run at most every INDEX_SYNC_SECONDS unless sync is set.
+        """
+        if not self._loaded:
+            await db.run_sync(self.rebuild)
+            return
+        changed = await self._changes.changed_ids(db, force=sync)
+        if changed is None:
+            await db.run_sync(self.rebuild)
+        elif changed:
+            skills: Dict[int, List[str]] = {job_id: [] for job_id in changed}
+            for job_id, name in await db.execute(
+                select(models.JobSkill.job_id, models.JobSkill.normalized_name)
+                .where(models.JobSkill.job_id.in_(changed))
+            ):
+                skills[job_id].append(name)
+            for job_id, names in skills.items():
+                # Deleted jobs (and jobs left without skills) have no rows
+                if names:
+                    self.add_job(job_id, names)
+                else:
+                    self.remove_job(job_id)
+
+    def rebuild(self, db: Session):
+        position = db.scalar(latest_change())
+        rows = db.query(models.JobSkill.job_id, models.JobSkill.normalized_name).all()
+        by_job = defaultdict(list)
+        for job_id, name in rows:
+            by_job[job_id].append(name)
+        with self._lock:
+            self._vocab = SkillVocabulary()
+            self._job_skills = {}
+            for job_id, names in by_job.items():
+                self._add(job_id, names, count=False)
+            # Compiled here rather than on the first read, so a pre-fork warm-up covers it too
+            matrix = self._matrix = JobSkillMatrix(self._job_skills, len(self._vocab))
+            # Aggregates in bulk from the matrix instead of job by job
+            self._frequency = Counter({
+                skill_id: jobs for skill_id, jobs in enumerate(matrix.frequencies().tolist()) if jobs
+            })
+            self._cooccurrence = defaultdict(Counter)
+            for left, right, jobs in matrix.pair_counts():
+                for a, b, n in zip(left.tolist(), right.tolist(), jobs.tolist()):
+                    self._cooccurrence[a][b] += n
+            self._changes.start_at(position)
+            self._loaded = True
+
+    def reset(self):
+        # Forget the in-memory copy; it is reloaded from the database on next use
+        with self._lock:
+            self._loaded = False
+
+    def add_job(self, job_id: int, skills: Iterable[str]):
+        with self._lock:
+            self._drop(job_id)
+            self._add(job_id, skills)
+            self._matrix = None
+
+    def remove_job(self, job_id: int):
+        with self._lock:
+            if self._drop(job_id):
+                self._matrix = None
+
+    def match(
+        self,
+        user_skills: Iterable[Tuple[str, Optional[int]]],
+        threshold: int = MATCH_THRESHOLD,
+        weighted: bool = False
+    ) -> List[Tuple[int, int]]:
+        """Return (job_id, score) pairs with score >= threshold, best first.
+
+        user_skills are (name, level) pairs. With weighted=True each matched
+        skill counts level/100 instead of 1.
+        """
+        with self._lock:
+            best: Dict[int, float] = {}
+            for name, level in user_skills:
+                skill_id = self._vocab.get(normalize_skill(name)) if name else None
+                if skill_id is not None:
+                    best[skill_id] = max(best.get(skill_id, 0.0), skill_weight(level, weighted))
+            if not best:
+                return []
+            if self._matrix is None:
+                self._matrix = JobSkillMatrix(self._job_skills, len(self._vocab))
+            matrix = self._matrix
+
+        scores = matrix.score(np.fromiter(best, dtype=np.int64), np.fromiter(best.values(), dtype=np.float64))
+        # Truncate like int() did in the original per-job loop
+        scores = scores.astype(np.int64)
+        hits = np.nonzero(scores >= max(threshold, 1))[0]
+        order = np.lexsort((matrix.job_ids[hits], -scores[hits]))
+        hits = hits[order]
+        return list(zip(matrix.job_ids[hits].tolist(), scores[hits].tolist()))
+
+    def skill_gap(
+        self,
+        user_skills: Iterable[str],
+        threshold: int = MATCH_THRESHOLD,
+        limit: int = 10
+    ) -> Tuple[int, List[Tuple[str, int, int, int]]]:
+        """Skills the user lacks, ranked by how many more jobs would reach threshold with each.
+
+        user_skills are skill names; scoring is unweighted like default
+        recommendations. Returns (jobs at or above threshold now, [(normalized
+        name, jobs unlocked, jobs requiring it, jobs requiring it together
+        with one of the user's skills)]). Ties go to the skill that co-occurs
+        more with the user's skills, then to the more common one.
+        """
+        with self._lock:
+            have = {self._vocab.get(normalize_skill(name)) for name in user_skills if name} - {None}
+            if self._matrix is None:
+                self._matrix = JobSkillMatrix(self._job_skills, len(self._vocab))
+            matrix = self._matrix
+            related: Counter = Counter()
+            for skill_id in have:
+                related.update(self._cooccurrence.get(skill_id, ()))
+
+        matching, unlocked = matrix.unlock_counts(np.fromiter(have, dtype=np.int64, count=len(have)), threshold)
+        candidates = (set(np.flatnonzero(unlocked).tolist()) | related.keys()) - have
+
+        with self._lock:
+            gaps = [
+                (self._vocab.name(skill_id), int(unlocked[skill_id]), self._frequency.get(skill_id, 0), related[skill_id])
+                for skill_id in candidates
+            ]
+        gaps.sort(key=lambda gap: (-gap[1], -gap[3], -gap[2], gap[0]))
+        return matching, gaps[:limit]
+
+    # --- internal helpers, caller holds the lock ---
+    def _add(self, job_id: int, skills: Iterable[str], count: bool = True):
+        skill_ids = frozenset(self._vocab.add(normalize_skill(s)) for s in skills if s and s.strip())
+        if skill_ids:
+            self._job_skills[job_id] = skill_ids
+            if count:
+                self._count(skill_ids, 1)
+
+    def _drop(self, job_id: int) -> bool:
+        skill_ids = self._job_skills.pop(job_id, None)
+        if skill_ids is None:
+            return False
+        self._count(skill_ids, -1)
+        return True
+
+    def _count(self, skill_ids: FrozenSet[int], delta: int):
+        for a in skill_ids:
+            self._frequency[a] += delta
+            if not self._frequency[a]:
+                del self._frequency[a]
+            row = self._cooccurrence[a]
+            for b in skill_ids:
+                if b != a:
+                    row[b] += delta
+                    if not row[b]:
+                        del row[b]
+
+
+class CandidateIndex:
+    """Inverted index of normalized skill name -> job seekers with that skill.
+
+    Lets recruiters rank candidates for a job by looking only at users who
+    have at least one of its skills, instead of scanning every user. Built
+    lazily from the skills table and re-synced per user by the skill write
+    endpoints; writes made by other workers arrive through the change log.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[int, Optional[int]]] = defaultdict(dict)
+        self._user_skills: Dict[int, Dict[str, Optional[int]]] = {}
+        self._changes = ChangeCursor(USER)
+        self._loaded = False
+
+    async def ensure_loaded(self, db: AsyncSession, sync: bool = False):
+        """Load the index, or re-sync users changed by any process since the last check."""
+        if not self._loaded:
+            await db.run_sync(self.rebuild)
+            return
+        changed = await self._changes.changed_ids(db, force=sync)
+        if changed is None:
+            await db.run_sync(self.rebuild)
+        elif changed:
+            skills: Dict[int, List[Tuple[str, Optional[int]]]] = {user_id: [] for user_id in changed}
+            for user_id, name, level in await db.execute(
+                select(models.Skill.user_id, models.Skill.name, models.Skill.level).join(
+                    models.User, models.Skill.user_id == models.User.id
+                ).where(models.User.role == models.UserRole.JOBSEEKER, models.Skill.user_id.in_(changed))
+            ):
+                skills[user_id].append((name, level))
+            with self._lock:
+                for user_id, user_skills in skills.items():
+                    self._set(user_id, user_skills)
+
+    def rebuild(self, db: Session):
+        position = db.scalar(latest_change())
+        rows = db.query(models.Skill.user_id, models.Skill.name, models.Skill.level).join(
+            models.User, models.Skill.user_id == models.User.id
+        ).filter(models.User.role == models.UserRole.JOBSEEKER).all()
+        by_user = defaultdict(list)
+        for user_id, name, level in rows:
+            by_user[user_id].append((name, level))
+        with self._lock:
+            self._postings = defaultdict(dict)
+            self._user_skills = {}
+            for user_id, skills in by_user.items():
+                self._set(user_id, skills)
+            self._changes.start_at(position)
+            self._loaded = True
+
+    def reset(self):
+        with self._lock:
+            self._loaded = False
+
+    def sync_user(self, user):
+        # user: a models.User or user_cache.CachedUser (id, role and skills are read)
+        # Only job seekers are candidates; anyone else is dropped from the index
+        skills = [(s.name, s.level) for s in user.skills] if user.role == models.UserRole.JOBSEEKER else []
+        with self._lock:
+            self._set(user.id, skills)
+
+    def top_candidates(
+        self,
+        required: Iterable[str],
+        limit: int,
+        min_score: int = MATCH_THRESHOLD,
+        weighted: bool = False
+    ) -> List[Tuple[int, int]]:
+        """Return up to limit (user_id, score) pairs with score >= min_score, best first."""
+        required = [normalize_skill(s) for s in required if s and s.strip()]
+        with self._lock:
+            candidates = defaultdict(list)
+            for skill in set(required):
+                for user_id, level in self._postings.get(skill, {}).items():
+                    candidates[user_id].append((skill, level))
+
+        user_ids, scores = score_candidates(required, candidates, weighted)
+        floor = max(min_score, 1)
+        # Bounded heap: O(candidates * log(limit)), ties go to the lower user id
+        best = heapq.nlargest(
+            limit,
+            ((score, user_id) for user_id, score in zip(user_ids.tolist(), scores.astype(np.int64).tolist()) if score >= floor),
+            key=lambda item: (item[0], -item[1])
+        )
+        return [(user_id, score) for score, user_id in best]
+
+    # --- internal helper, caller holds the lock ---
+    def _set(self, user_id: int, skills: Iterable[Tuple[str, Optional[int]]]):
+        for skill in self._user_skills.pop(user_id, {}):
+            postings = self._postings.get(skill)
+            if postings is not None:
+                postings.pop(user_id, None)
+                if not postings:
+                    del self._postings[skill]
+        levels: Dict[str, Optional[int]] = {}
+        for name, level in skills:
+            if not name or not name.strip():
+                continue
+            skill = normalize_skill(name)
+            # Keep the best level when the same skill is stored twice
+            if skill not in levels or (level or 0) > (levels[skill] or 0):
+                levels[skill] = level
+        if levels:
+            self._user_skills[user_id] = levels
+            for skill, level in levels.items():
+                self._postings[skill][user_id] = level
+
+
+# Shared per-process indexes used by the jobs and skills routers
+job_index = SkillIndex()
+candidate_index = CandidateIndex()
@@ -0,0 +1,413 @@
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from . import config, models
+from .change_log import JOB, ChangeCursor, latest_change
+from .database import SessionLocal
+
+try:
+    import fcntl
+except ImportError:  # Windows: background rebuilds aren't coordinated across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Resume-to-job text matching: TF-IDF vectors of every job's title, skills
+# and description, ranked by cosine similarity to the resume text.
+#
+# The bulk of the index is a segment of .npy files that every worker
+# memory-maps, so it is built once (python -m app.migrations, or the first
+# query that finds none) and shared through the page cache. Jobs written
+# since the segment was built are kept in a small overlay that every
+# process fills from the change log (see change_log), whichever worker
+# made the write. When it grows past JOB_TEXT_INDEX_MAX_PENDING, the one
+# process holding the directory's build lock writes a new segment, and the
+# other workers switch to it within JOB_TEXT_INDEX_CHECK_SECONDS.
+
+# Words with digits and the "+", "#" and inner "." of c++, c#, node.js
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to was we were "
+    "will with you your i my me".split()
+)
+# Title and skill words say more about a job than its description
+TITLE_WEIGHT = 2
+SKILLS_WEIGHT = 2
+# Rows fetched per round trip while rebuilding
+REBUILD_BATCH = 5000
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOP_WORDS] if text else []
+
+
+def job_terms(title: Optional[str], required_skills: Optional[str], description: Optional[str]) -> Counter:
+    counts = Counter(tokenize(description))
+    for term in tokenize(title):
+        counts[term] += TITLE_WEIGHT
+    for term in tokenize(required_skills):
+        counts[term] += SKILLS_WEIGHT
+    return counts
+
+
+def term_weight(count: float) -> float:
+    # Sublinear tf: the tenth "python" in a resume adds little
+    return 1.0 + math.log(count)
+
+
+# --- On-disk segment ---
+class SegmentBuilder:
+    """Accumulates job term counts and writes them as a segment directory."""
+
+    def __init__(self):
+        self._term_ids: Dict[str, int] = {}
+        self._job_ids: List[int] = []
+        self._doc_terms: List[np.ndarray] = []
+        self._doc_counts: List[np.ndarray] = []
+
+    def add(self, job_id: int, counts: Counter):
+        term_ids = self._term_ids
+        self._job_ids.append(job_id)
+        self._doc_terms.append(np.fromiter(
+            (term_ids.setdefault(term, len(term_ids)) for term in counts), dtype=np.int32, count=len(counts)))
+        self._doc_counts.append(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+
+    def write(self, directory: str, built_at: float, change_id: int) -> str:
+        """Write the segment and make it current. Returns the generation name.
+
+        change_id is the change log position read before the jobs were.
+        """
+        order = np.argsort(np.array(self._job_ids, dtype=np.int64), kind="stable")
+        job_ids = np.array(self._job_ids, dtype=np.int64)[order]
+        docs = len(job_ids)
+        lengths = np.array([len(self._doc_terms[i]) for i in order.tolist()], dtype=np.int64)
+        cols = np.concatenate([self._doc_terms[i] for i in order.tolist()]) if docs else np.empty(0, np.int32)
+        counts = np.concatenate([self._doc_counts[i] for i in order.tolist()]) if docs else np.empty(0, np.float32)
+        rows = np.repeat(np.arange(docs, dtype=np.int32), lengths)
+
+        vocab = len(self._term_ids)
+        df = np.bincount(cols, minlength=vocab)
+        idf = (np.log((1 + docs) / (1 + df)) + 1).astype(np.float32)
+        weights = ((1 + np.log(counts)) * idf[cols]).astype(np.float32)
+        # L2-normalize every job row
+        norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2, minlength=docs))
+        weights /= np.maximum(norms, 1e-12)[rows].astype(np.float32)
+
+        # Column-wise (term -> job rows), so a query only reads its own terms' postings
+        by_term = np.argsort(cols, kind="stable")
+        indptr = np.zeros(vocab + 1, dtype=np.int64)
+        np.cumsum(df, out=indptr[1:])
+
+        generation = f"{int(built_at * 1000)}-{os.getpid()}"
+        path = os.path.join(directory, generation)
+        os.makedirs(path)
+        np.save(os.path.join(path, "job_ids.npy"), job_ids)
+        np.save(os.path.join(path, "idf.npy"), idf)
+        np.save(os.path.join(path, "indptr.npy"), indptr)
+        np.save(os.path.join(path, "rows.npy"), rows[by_term])
+        np.save(os.path.join(path, "weights.npy"), weights[by_term])
+        terms = sorted(self._term_ids, key=self._term_ids.__getitem__)
+        with open(os.path.join(path, "terms.json"), "w") as f:
+            json.dump(terms, f)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"builtAt": built_at, "changeId": change_id, "jobs": docs, "terms": vocab, "nnz": len(cols)}, f)
+
+        # Switch atomically, then drop all but the current and previous generation
+        # (workers that still map an older one keep reading it until they swap)
+        pointer = os.path.join(directory, "CURRENT")
+        previous = current_generation(directory)
+        if previous is not None and int(previous.split("-")[0]) > int(built_at * 1000):
+            # Another process finished a build from a newer snapshot first; keep it
+            shutil.rmtree(path, ignore_errors=True)
+            return previous
+        with open(pointer + ".tmp", "w") as f:
+            f.write(generation)
+        os.replace(pointer + ".tmp", pointer)
+        for name in os.listdir(directory):
+            if name not in (generation, previous, "CURRENT") and os.path.isdir(os.path.join(directory, name)):
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        return generation
+
+
+@contextlib.contextmanager
+def build_lock(directory: str):
+    """Yields True if this process got the directory's (non-blocking) build lock."""
+    if fcntl is None:
+        yield True
+        return
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".build-lock"), "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def current_generation(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class Segment:
+    """A built segment, memory-mapped read-only."""
+
+    def __init__(self, directory: str, generation: str):
+        path = os.path.join(directory, generation)
+        self.generation = generation
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.built_at = meta["builtAt"]
+        # Segments written before the change log replay it from the start (or rebuild)
+        self.change_id = meta.get("changeId", 0)
+        with open(os.path.join(path, "terms.json")) as f:
+            self.term_ids = {term: i for i, term in enumerate(json.load(f))}
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode="r")
+        self.job_ids = load("job_ids.npy")
+        self.idf = load("idf.npy")
+        self.indptr = load("indptr.npy")
+        self.rows = load("rows.npy")
+        self.weights = load("weights.npy")
+        # Terms that appear in no job of the segment (only in newer, overlay jobs)
+        self.new_term_idf = math.log((1 + len(self.job_ids)) / 2) + 1
+
+    def idf_of(self, term: str) -> float:
+        term_id = self.term_ids.get(term)
+        return float(self.idf[term_id]) if term_id is not None else self.new_term_idf
+
+    def vector(self, counts: Counter) -> Dict[str, float]:
+        weights = {term: term_weight(count) * self.idf_of(term) for term, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+
+    def scores(self, query: Dict[str, float]) -> np.ndarray:
+        """Cosine similarity of every segment job to a normalized query vector."""
+        rows, weights = [], []
+        for term, q in query.items():
+            term_id = self.term_ids.get(term)
+            if term_id is not None:
+                start, end = self.indptr[term_id], self.indptr[term_id + 1]
+                rows.append(self.rows[start:end])
+                weights.append(self.weights[start:end] * q)
+        if not rows:
+            return np.zeros(len(self.job_ids), dtype=np.float64)
+        return np.bincount(np.concatenate(rows), weights=np.concatenate(weights), minlength=len(self.job_ids))
+
+    def rows_of(self, job_ids: Iterable[int]) -> np.ndarray:
+        ids = np.fromiter(job_ids, dtype=np.int64)
+        positions = np.searchsorted(self.job_ids, ids)
+        positions = positions[positions < len(self.job_ids)]
+        return positions[np.isin(self.job_ids[positions], ids)]
+
+
+class JobTextIndex:
+    """TF-IDF index of job postings for matching free text (resumes) against them."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._segment: Optional[Segment] = None
+        # job id -> (written at, term counts, or None once deleted)
+        self._overlay: Dict[int, Tuple[float, Optional[Counter]]] = {}
+        # Overlay vectors against the current segment's idf, and their terms; rebuilt lazily
+        self._overlay_vectors: Optional[Tuple[Dict[int, Dict[str, float]], Set[str]]] = None
+        self._checked_at = 0.0
+        self._changes = ChangeCursor(JOB)
+        self._load_lock = asyncio.Lock()
+        self._build_lock = asyncio.Lock()
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self.rebuilds = 0
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """Map the current segment, then apply jobs changed by any process since the last check.
+
+        The segment is looked up at most every JOB_TEXT_INDEX_CHECK_SECONDS,
+        the change log at most every INDEX_SYNC_SECONDS.
+        """
+        now = time.monotonic()
+        swapped = False
+        if self._segment is None or now - self._checked_at >= config.JOB_TEXT_INDEX_CHECK_SECONDS:
+            async with self._load_lock:
+                if self._segment is None or now - self._checked_at >= config.JOB_TEXT_INDEX_CHECK_SECONDS:
+                    swapped = await self._load_current(db)
+                    self._checked_at = now
+        await self.sync(db, force=swapped)
+
+    async def _load_current(self, db: AsyncSession) -> bool:
+        # True when this process switched to another segment
+        generation = current_generation(self.directory)
+        if generation is None:
+            await self.rebuild(db)
+            return True
+        if self._segment is None or generation != self._segment.generation:
+            # Built by another process (or the migration step): just map it
+            self._swap(await run_in_threadpool(Segment, self.directory, generation))
+            return True
+        return False
+
+    async def sync(self, db: AsyncSession, force: bool = False):
+        """Reload the jobs written since the segment's snapshot, or rebuild if the log has moved on."""
+        changed = await self._changes.changed_ids(db, force=force)
+        if changed is None:
+            await self.rebuild(db)
+        elif changed:
+            found = set()
+            for job_id, title, required_skills, description in await db.execute(
+                select(models.Job.id, models.Job.title, models.Job.required_skills, models.Job.description)
+                .where(models.Job.id.in_(changed))
+            ):
+                self.add_job(job_id, title, required_skills, description)
+                found.add(job_id)
+            for job_id in changed - found:
+                self.remove_job(job_id)
+
+    async def rebuild(self, db: AsyncSession) -> str:
+        """Build a segment from every job in the database and switch to it."""
+        async with self._build_lock:
+            built_at = time.time()
+            change_id = await db.scalar(latest_change())
+            builder = SegmentBuilder()
+            result = await db.stream(
+                select(models.Job.id, models.Job.title, models.Job.required_skills, models.Job.description)
+                .execution_options(yield_per=REBUILD_BATCH)
+            )
+            async for rows in result.partitions():
+                await run_in_threadpool(self._add_rows, builder, rows)
+            os.makedirs(self.directory, exist_ok=True)
+            generation = await run_in_threadpool(builder.write, self.directory, built_at, change_id)
+            self._swap(await run_in_threadpool(Segment, self.directory, generation))
+            self.rebuilds += 1
+            return generation
+
+    @staticmethod
+    def _add_rows(builder: SegmentBuilder, rows):
+        for job_id, title, required_skills, description in rows:
+            builder.add(job_id, job_terms(title, required_skills, description))
+
+    def _swap(self, segment: Segment):
+        with self._lock:
+            # Overlay entries written before the segment's snapshot are in it now
+            self._overlay = {
+                job_id: entry for job_id, entry in self._overlay.items() if entry[0] >= segment.built_at
+            }
+            self._segment = segment
+            self._overlay_vectors = None
+            # Changes after the snapshot are re-read from the log on the next sync
+            self._changes.start_at(segment.change_id)
+
+    # --- Incremental updates (called after the job write is committed) ---
+    def add_job(self, job_id: int, title: Optional[str], required_skills: Optional[str], description: Optional[str]):
+        self._set(job_id, job_terms(title, required_skills, description))
+
+    def remove_job(self, job_id: int):
+        self._set(job_id, None)
+
+    def _set(self, job_id: int, counts: Optional[Counter]):
+        with self._lock:
+            self._overlay[job_id] = (time.time(), counts)
+            self._overlay_vectors = None
+            full = self._is_full()
+        if full:
+            self._schedule_rebuild()
+
+    def _is_full(self) -> bool:
+        jobs = len(self._segment.job_ids) if self._segment is not None else 0
+        return len(self._overlay) >= max(config.JOB_TEXT_INDEX_MAX_PENDING, jobs // 10)
+
+    def _schedule_rebuild(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = loop.create_task(self._rebuild_in_background())
+
+    async def _rebuild_in_background(self):
+        # Every worker's overlay fills up at about the same time; one of them builds
+        try:
+            with build_lock(self.directory) as acquired:
+                if not acquired:
+                    return
+                async with SessionLocal() as db:
+                    # A segment another worker finished meanwhile may have emptied the overlay
+                    if await self._load_current(db):
+                        await self.sync(db, force=True)
+                    if self._is_full():
+                        await self.rebuild(db)
+        except Exception:
+            logger.exception("Rebuilding the job text index failed")
+
+    # --- Queries ---
+    def search(self, text: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """Top (job_id, cosine similarity) pairs for the text, best first."""
+        counts = Counter(tokenize(text))
+        with self._lock:
+            segment = self._segment
+            if segment is None:
+                return []
+            overlay_ids = list(self._overlay)
+            if self._overlay_vectors is None:
+                vectors = {
+                    job_id: segment.vector(terms)
+                    for job_id, (_, terms) in self._overlay.items() if terms
+                }
+                self._overlay_vectors = (vectors, set().union(*vectors.values()))
+            vectors, overlay_terms = self._overlay_vectors
+
+        # Terms no job uses can't match anything; leaving them out keeps similarities comparable
+        query = segment.vector(Counter({
+            term: count for term, count in counts.items() if term in segment.term_ids or term in overlay_terms
+        }))
+        if not query:
+            return []
+
+        scores = segment.scores(query)
+        # Jobs updated or deleted since the segment was built are scored from the overlay
+        if overlay_ids:
+            scores[segment.rows_of(overlay_ids)] = 0.0
+        top = np.flatnonzero(scores)
+        if len(top) > limit:
+            top = top[np.argpartition(-scores[top], limit - 1)[:limit]]
+        ranked = [(int(segment.job_ids[row]), float(scores[row])) for row in top.tolist()]
+        for job_id, vector in vectors.items():
+            similarity = sum(q * vector[term] for term, q in query.items() if term in vector)
+            if similarity > 0:
+                ranked.append((job_id, similarity))
+        # Segment weights are float32: round so equal jobs tie whichever side they are on
+        ranked.sort(key=lambda pair: (-round(pair[1], 6), pair[0]))
+        return ranked[:limit]
+
+    def stats(self) -> dict:
+        with self._lock:
+            segment = self._segment
+            return {
+                "generation": segment.generation if segment else None,
+                "jobs": len(segment.job_ids) if segment else 0,
+                "terms": len(segment.term_ids) if segment else 0,
+                "pendingJobs": len(self._overlay),
+                "rebuilds": self.rebuilds,
+            }
+
+
+job_text_index = JobTextIndex(config.JOB_TEXT_INDEX_DIR)
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from . import config, models
+from .change_log import USER, ChangeCursor, latest_change
+
+
+class CachedSkill(NamedTuple):
+    id: int
+    name: str
+    level: int
+    category: str
+    user_id: int
+
+
+class CachedUser(NamedTuple):
+    """Read-only snapshot of a user and their skills, safe to share between requests."""
+    id: int
+    email: str
+    full_name: str
+    role: models.UserRole
+    skills: Tuple[CachedSkill, ...]
+
+
+class UserCache:
+    """TTL + LRU cache of CachedUser snapshots keyed by user id.
+
+    Lets get_current_user answer from memory instead of querying users and
+    lazy-loading skills on every request. Skill writes refresh the owner's
+    entry in the writing process; other processes evict it when they next
+    read the change log (at most every INDEX_SYNC_SECONDS). The TTL is a
+    backstop for changes that aren't logged.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, CachedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._changes = ChangeCursor(USER)
+
+    def get(self, user_id: int) -> Optional[CachedUser]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user: CachedUser):
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    async def load(self, db: AsyncSession, user_id: int) -> Optional[CachedUser]:
+        """Return the cached snapshot, loading user + skills on a miss."""
+        await self.sync(db)
+        user = self.get(user_id)
+        if user is not None:
+            return user
+        # populate_existing: after a skill write the session may still hold the old skills
+        db_user = await db.scalar(
+            select(models.User).options(selectinload(models.User.skills)).where(models.User.id == user_id)
+            .execution_options(populate_existing=True)
+        )
+        if db_user is None:
+            return None
+        user = snapshot(db_user)
+        self.put(user)
+        return user
+
+    async def sync(self, db: AsyncSession, force: bool = False):
+        """Evict users changed by any process since the last check."""
+        changed = await self._changes.changed_ids(db, force=force)
+        if changed is None:
+            # First use, or further behind than the retained log: start over
+            position = await db.scalar(latest_change())
+            self.clear()
+            self._changes.start_at(position)
+        else:
+            for user_id in changed:
+                self.invalidate(user_id)
+
+    async def refresh(self, db: AsyncSession, user_id: int) -> Optional[CachedUser]:
+        # After a write: drop the stale snapshot and load the current one
+        self.invalidate(user_id)
+        return await self.load(db, user_id)
+
+
+def snapshot(db_user: models.User) -> CachedUser:
+    return CachedUser(
+        id=db_user.id,
+        email=db_user.email,
+        full_name=db_user.full_name,
+        role=db_user.role,
+        skills=tuple(
+            CachedSkill(id=s.id, name=s.name, level=s.level, category=s.category, user_id=s.user_id)
+            for s in db_user.skills
+        ),
+    )
+
+
+user_cache = UserCache(max_entries=config.USER_CACHE_SIZE, ttl=config.USER_CACHE_TTL)
@@ -0,0 +1,153 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from .metrics import call_collecting_spans, record_span
+
+
+class BoundedPool:
+    """Process pool for CPU-bound work with a cap on queued + running jobs.
+
+    Keeps pypdf/python-docx and bcrypt off the event loop. When more than
+    max_pending jobs are outstanding new work is rejected with 503 instead of
+    queueing without bound. A job still running after timeout seconds gets a
+    504 and its workers are killed, so a document that never finishes parsing
+    doesn't hold a slot forever. With workers=0 work runs in a thread pool
+    instead (threads can't be killed; the stuck one is abandoned).
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int, timeout: float):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._running: set = set()
+        self._lock = threading.Lock()
+        # Metrics: latency is measured from submit to completion (queue wait + run)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pool": self.name,
+                "workers": self.workers,
+                "pending": self._pending,
+                "maxPending": self.max_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timedOut": self.timed_out,
+                "avgSeconds": round(self.total_seconds / self.completed, 6) if self.completed else 0.0,
+                "maxSeconds": round(self.max_seconds, 6),
+            }
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    # spawn: don't fork a server process holding DB connections and threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+            return self._executor
+
+    def _reserve(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Server busy ({self.name}), try again shortly.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+
+    def _release(self, future=None, started: Optional[float] = None):
+        with self._lock:
+            if future is not None:
+                if future not in self._running:
+                    return  # already released when the caller timed out
+                self._running.discard(future)
+            self._pending -= 1
+            if started is None:
+                return
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                return
+            elapsed = time.perf_counter() - started
+            self.completed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    async def run(self, fn: Callable, *args):
+        self._reserve()
+        started = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            # Spans recorded inside the worker come back with the result
+            future = executor.submit(call_collecting_spans, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        with self._lock:
+            self._running.add(future)
+        future.add_done_callback(lambda f: self._release(f, started))
+        try:
+            result, spans = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            # The worker may never finish: kill it and free the slot now
+            self._discard(executor, kill=True)
+            self._release(future)
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"Processing timed out after {self.timeout:g}s.",
+            )
+        except BrokenExecutor:
+            # A worker died (e.g. OOM on a huge document); start a fresh pool next time
+            self._discard(executor)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Worker crashed while processing the request.",
+            )
+        for name, seconds in spans:
+            record_span(name, seconds)
+        return result
+
+    def _discard(self, executor: Executor, kill: bool = False):
+        """Drop executor if it is still current; the next run() starts a fresh one."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # another caller already replaced it
+            self._executor = None
+        # Snapshot before shutdown() clears it
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        if kill:
+            # Other jobs on this pool fail with BrokenProcessPool (500)
+            for process in processes:
+                process.kill()
+
+    def shutdown(self):
+        with self._lock:
+            executor = self._executor
+        if executor is not None:
+            self._discard(executor)
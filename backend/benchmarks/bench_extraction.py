@@ -0,0 +1,13 @@
+from app.resume_analysis import analyze_document, extract_text_from_docx, extract_text_from_pdf
+
+
+def test_extract_pdf(benchmark, resume_files):
+    benchmark(extract_text_from_pdf, resume_files["pdf"])
+
+
+def test_extract_docx(benchmark, resume_files):
+    benchmark(extract_text_from_docx, resume_files["docx"])
+
+
+def test_analyze_document_pdf(benchmark, resume_files):
+    benchmark(analyze_document, "resume.pdf", resume_files["pdf"])
@@ -0,0 +1,41 @@
+import pytest
+
+from app.job_feed import JobFeed, MemoryBroker
+from app.serialization import dumps
+from app.skill_index import normalize_skill, parse_skills
+from app.user_cache import CachedSkill
+
+
+class Seeker:
+    # Just what JobFeed.subscribe reads from a user_cache.CachedUser
+    def __init__(self, id, skills):
+        self.id = id
+        self.skills = tuple(CachedSkill(0, name, level, "Technical", id) for name, level in skills)
+
+
+@pytest.fixture(scope="module")
+def job_feed(users):
+    # Every job seeker of the scale connected to this one process
+    feed = JobFeed(MemoryBroker(), len(users), 1)
+    subscriptions = [feed.subscribe(Seeker(user_id, user["skills"]))
+                     for user_id, user in enumerate(users, start=1) if user["skills"]]
+    return feed, subscriptions
+
+
+def test_job_feed_fan_out(benchmark, job_feed, jobs):
+    # One published job: find the subscribers it matches and queue their frames
+    feed, subscriptions = job_feed
+    job = jobs[0]
+    message = dumps({
+        "event": "created",
+        "job": {"id": 1, "title": job["title"], "matchScore": 0},
+        "skills": [normalize_skill(s) for s in parse_skills(job["required_skills"])],
+    })
+
+    def drain():
+        for subscription in subscriptions:
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+        return (message,), {}
+
+    benchmark.pedantic(feed.deliver, setup=drain, rounds=50)
@@ -0,0 +1,17 @@
+from app.resume_analysis import analyze_text, keyword_matcher
+
+
+def test_keyword_scan(benchmark, resume_text):
+    benchmark(keyword_matcher.scan, resume_text)
+
+
+def test_analyze_text(benchmark, resume_text):
+    benchmark(analyze_text, resume_text)
+
+
+def test_keyword_scan_5000_terms(benchmark, resume_text):
+    # Scan cost should stay close to test_keyword_scan as the keyword lists grow
+    from app.keyword_matcher import KeywordMatcher
+
+    matcher = KeywordMatcher({"terms": [f"Term{i} Skill{i % 97}" for i in range(5000)] + list(keyword_matcher._owners)})
+    benchmark(matcher.scan, resume_text)
@@ -0,0 +1,33 @@
+from app.skill_index import normalize_skill, parse_skills
+
+
+def test_recommendations_match(benchmark, job_index, jobseeker_skills):
+    benchmark(job_index.match, jobseeker_skills)
+
+
+def test_recommendations_match_weighted(benchmark, job_index, jobseeker_skills):
+    benchmark(job_index.match, jobseeker_skills, weighted=True)
+
+
+def test_candidates_top_10(benchmark, candidate_index, jobs):
+    required = [normalize_skill(s) for s in parse_skills(jobs[0]["required_skills"])]
+    benchmark(candidate_index.top_candidates, required, 10)
+
+
+def test_candidates_top_10_weighted(benchmark, candidate_index, jobs):
+    required = [normalize_skill(s) for s in parse_skills(jobs[0]["required_skills"])]
+    benchmark(candidate_index.top_candidates, required, 10, weighted=True)
+
+
+def test_job_index_add_job(benchmark, job_index):
+    # Cost of one job write plus the matrix recompile it triggers on the next read
+    def add_and_match():
+        job_index.add_job(10**9, ["python", "sql", "docker"])
+        job_index.match([("python", None)])
+
+    benchmark(add_and_match)
+    job_index.remove_job(10**9)
+
+
+def test_skill_gap(benchmark, job_index, jobseeker_skills):
+    benchmark(job_index.skill_gap, [name for name, _ in jobseeker_skills])
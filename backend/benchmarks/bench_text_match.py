@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+import pytest
+
+from app.text_index import JobTextIndex, SegmentBuilder, job_terms
+
+
+@pytest.fixture(scope="module")
+def text_index(jobs, tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("job-text-index"))
+    builder = SegmentBuilder()
+    for job_id, job in enumerate(jobs, start=1):
+        builder.add(job_id, job_terms(job["title"], job["required_skills"], job["description"]))
+    builder.write(directory, time.time(), 0)
+    index = JobTextIndex(directory)
+    # Finds the segment on disk, so no database session is needed
+    asyncio.run(index._load_current(None))
+    return index
+
+
+def test_text_index_build(benchmark, jobs, tmp_path):
+    # Full segment build: tokenizing every job plus writing the .npy files
+    def build():
+        builder = SegmentBuilder()
+        for job_id, job in enumerate(jobs, start=1):
+            builder.add(job_id, job_terms(job["title"], job["required_skills"], job["description"]))
+        builder.write(str(tmp_path), time.time(), 0)
+
+    benchmark.pedantic(build, rounds=3)
+
+
+def test_resume_match_top_10(benchmark, text_index, resume_text):
+    benchmark(text_index.search, resume_text, 10)
+
+
+def test_resume_match_with_overlay(benchmark, text_index, resume_text, jobs):
+    # 500 jobs written since the segment was built are scored from the overlay
+    for job_id, job in enumerate(jobs[:500], start=1):
+        text_index.add_job(job_id, job["title"], job["required_skills"], job["description"])
+    benchmark(text_index.search, resume_text, 10)
@@ -0,0 +1,44 @@
+"""Compare two benchmarks.load result files.
+
+Usage (from backend/): python -m benchmarks.compare load-before.json load-after.json
+
+pytest-benchmark results (--benchmark-json) are compared with its own
+`pytest-benchmark compare` command.
+"""
+import argparse
+import json
+
+METRICS = (("p50Ms", "p50 ms", -1), ("p99Ms", "p99 ms", -1), ("rps", "req/s", 1))
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "     n/a"
+    return f"{(after - before) / before * 100:+7.1f}%"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"before: {before['meta'].get('commit')} {before['meta']['timestamp']}  "
+          f"after: {after['meta'].get('commit')} {after['meta']['timestamp']}")
+    print(f"{'endpoint':<36}" + "".join(f"{label:>28}" for _, label, _ in METRICS))
+    for name, new in after["endpoints"].items():
+        old = before["endpoints"].get(name)
+        if old is None:
+            continue
+        cells = []
+        for key, _, better in METRICS:
+            delta = change(old[key], new[key])
+            # Mark regressions: latency up or throughput down by more than 10%
+            worse = old[key] and (new[key] - old[key]) / old[key] * better < -0.10
+            cells.append(f"{old[key]:>9.2f} -> {new[key]:>9.2f} {delta}{'!' if worse else ' '}")
+        print(f"{name:<36}" + "".join(f"{cell:>28}" for cell in cells))
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from .datagen import SCALES, generate_jobs, generate_users
+from .documents import make_docx, make_pdf, resume_lines
+
+# BENCH_SCALE=1k|100k|1m sets how many jobs and users the in-memory indexes hold
+SCALE = os.getenv("BENCH_SCALE", "1k")
+
+
+@pytest.fixture(scope="session")
+def jobs():
+    return list(generate_jobs(SCALES[SCALE]))
+
+
+@pytest.fixture(scope="session")
+def users():
+    return list(generate_users(SCALES[SCALE]))
+
+
+@pytest.fixture(scope="session")
+def job_index(jobs):
+    from app.skill_index import SkillIndex, parse_skills
+
+    index = SkillIndex()
+    for job_id, job in enumerate(jobs, start=1):
+        index.add_job(job_id, parse_skills(job["required_skills"]))
+    index.match([("Python", None)])  # Compile the matrix outside the timed calls
+    return index
+
+
+@pytest.fixture(scope="session")
+def candidate_index(users):
+    from app import models
+    from app.skill_index import CandidateIndex
+    from app.user_cache import CachedSkill, CachedUser
+
+    index = CandidateIndex()
+    for user_id, user in enumerate(users, start=1):
+        skills = tuple(CachedSkill(0, name, level, "Technical", user_id) for name, level in user["skills"])
+        index.sync_user(CachedUser(user_id, user["email"], user["full_name"], models.UserRole(user["role"]), skills))
+    return index
+
+
+@pytest.fixture(scope="session")
+def jobseeker_skills(users):
+    # The first job seeker with a typical number of skills
+    return next(user["skills"] for user in users if len(user["skills"]) >= 5)
+
+
+@pytest.fixture(scope="session")
+def resume_text():
+    return "\n".join(resume_lines(300))
+
+
+@pytest.fixture(scope="session")
+def resume_files(tmp_path_factory):
+    """Paths of a 3-page PDF and an equivalent DOCX resume."""
+    directory = tmp_path_factory.mktemp("resumes")
+    lines = resume_lines(150)
+    pdf = directory / "resume.pdf"
+    pdf.write_bytes(make_pdf(lines))
+    docx_path = directory / "resume.docx"
+    make_docx(lines, str(docx_path))
+    return {"pdf": str(pdf), "docx": str(docx_path)}
@@ -0,0 +1,151 @@
+"""Synthetic users, skills and jobs for benchmarks.
+
+Usage (from backend/): python -m benchmarks.datagen bench.db [--scale 1k|100k|1m] [--seed 1] [--no-materialize]
+
+The generators are deterministic for a given seed, so two runs at the same
+scale benchmark the same data. Skill popularity follows a Zipf-like curve
+(a few skills like Python or React are everywhere, most are rare), which is
+what makes inverted-index scoring pay off on real catalogs.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Iterator, List
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+# Every generated user can log in with this password
+PASSWORD = "benchpass"
+
+COMMON_SKILLS = [
+    "Python", "JavaScript", "React", "SQL", "AWS", "Docker", "TypeScript", "Node.js", "Java", "Git",
+    "Kubernetes", "FastAPI", "Django", "PostgreSQL", "Go", "Rust", "C++", "HTML/CSS", "MongoDB", "Redis",
+    "Machine Learning", "Data Analysis", "CI/CD", "Linux", "GraphQL", "Terraform", "Azure", "GCP", "Kafka", "Spark",
+]
+TITLES = ["Backend Developer", "Frontend Developer", "Full Stack Engineer", "Data Engineer", "ML Engineer",
+          "DevOps Engineer", "Platform Engineer", "Data Analyst", "Mobile Developer", "Site Reliability Engineer"]
+LEVELS = ["Junior", "", "Senior", "Staff", "Lead"]
+COMPANIES = [f"{a} {b}" for a in ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Tyrell")
+             for b in ("Labs", "Inc.", "Systems", "AI", "Cloud")]
+LOCATIONS = ["Remote", "New York", "San Francisco, CA", "London", "Berlin", "Bangalore", "Toronto", "Austin, TX"]
+TYPES = ["Full-time", "Part-time", "Contract", "Internship"]
+WORDS = ("build ship scale design own improve maintain APIs services pipelines dashboards models platform "
+         "customers team product data reliable fast secure distributed cloud modern").split()
+
+
+def skill_vocabulary(size: int = 500) -> List[str]:
+    return COMMON_SKILLS + [f"Skill {i}" for i in range(size - len(COMMON_SKILLS))]
+
+
+class SkillSampler:
+    """Draws distinct skills with Zipf-like popularity (weight 1/rank)."""
+
+    def __init__(self, rng: random.Random, vocabulary: List[str]):
+        self.rng = rng
+        self.vocabulary = vocabulary
+        self.weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def sample(self, low: int = 3, high: int = 8) -> List[str]:
+        count = self.rng.randint(low, high)
+        picked = dict.fromkeys(self.rng.choices(self.vocabulary, self.weights, k=count * 2))
+        return list(picked)[:count]
+
+
+def generate_jobs(count: int, seed: int = 1) -> Iterator[Dict[str, str]]:
+    """Job dicts with the schemas.JobCreate fields."""
+    rng = random.Random(seed)
+    skills = SkillSampler(rng, skill_vocabulary())
+    for i in range(count):
+        title = f"{rng.choice(LEVELS)} {rng.choice(TITLES)}".strip()
+        yield {
+            "title": title,
+            "company": rng.choice(COMPANIES),
+            "location": rng.choice(LOCATIONS),
+            "type": rng.choice(TYPES),
+            "salary_range": f"${rng.randrange(60, 200, 10)}k",
+            "required_skills": ", ".join(skills.sample()),
+            "description": " ".join(rng.choices(WORDS, k=40)),
+            "posted_date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        }
+
+
+def generate_users(count: int, seed: int = 1, recruiter_share: float = 0.1) -> Iterator[Dict]:
+    """User dicts (email, full_name, role value, skills as (name, level) pairs)."""
+    rng = random.Random(seed + 1)
+    skills = SkillSampler(rng, skill_vocabulary())
+    for i in range(count):
+        recruiter = rng.random() < recruiter_share
+        yield {
+            "email": f"user{i}@bench.example.com",
+            "full_name": f"Bench User {i}",
+            "role": "recruiter" if recruiter else "jobseeker",
+            "skills": [] if recruiter else [(name, rng.randrange(30, 101, 5)) for name in skills.sample(2, 10)],
+        }
+
+
+def use_database(path: str):
+    # Must run before any app module is imported: app.database reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(path)}"
+
+
+async def populate(count: int, seed: int = 1, materialize: bool = True, chunk: int = 5000) -> Dict[str, float]:
+    """Fill the configured (empty) database with count users and count jobs."""
+    from sqlalchemy import insert, select
+    from app import models, schemas, security
+    from app.database import SessionLocal, engine
+    from app.job_import import insert_chunk
+    from app.match_store import rebuild_all
+    from app.migrations import create_schema
+
+    timings = {}
+    await create_schema()
+    # One bcrypt hash shared by every user; hashing a million passwords is not what's being measured
+    hashed = security.get_password_hash(PASSWORD)
+
+    async with SessionLocal() as db:
+        started = time.perf_counter()
+        jobs = generate_jobs(count, seed)
+        while batch := [schemas.JobCreate(**job) for _, job in zip(range(chunk), jobs)]:
+            await insert_chunk(db, batch)
+        timings["jobs"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        users = generate_users(count, seed)
+        while batch := [user for _, user in zip(range(chunk), users)]:
+            result = await db.execute(
+                insert(models.User).returning(models.User.id, sort_by_parameter_order=True),
+                [{"email": u["email"], "full_name": u["full_name"], "hashed_password": hashed,
+                  "role": models.UserRole(u["role"])} for u in batch],
+            )
+            skill_rows = [
+                {"user_id": user_id, "name": name, "level": level, "category": "Technical"}
+                for user_id, user in zip(result.scalars().all(), batch)
+                for name, level in user["skills"]
+            ]
+            if skill_rows:
+                await db.execute(insert(models.Skill), skill_rows)
+            await db.commit()
+        timings["users"] = time.perf_counter() - started
+
+        if materialize:
+            started = time.perf_counter()
+            await rebuild_all(db)
+            timings["matches"] = time.perf_counter() - started
+    await engine.dispose()
+    return {name: round(seconds, 2) for name, seconds in timings.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic SkillNuron database")
+    parser.add_argument("path", help="SQLite file to create (must not exist)")
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-materialize", action="store_true", help="Skip building user_job_matches")
+    args = parser.parse_args()
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+
+    use_database(args.path)
+    print(asyncio.run(populate(SCALES[args.scale], args.seed, not args.no_materialize)))
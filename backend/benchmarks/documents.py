@@ -0,0 +1,62 @@
+"""Generated resume fixtures (PDF and DOCX) for extraction benchmarks.
+
+The PDF writer is a tiny hand-rolled one (Helvetica text, one content
+stream per page) so no PDF library beyond the app's own pypdf is needed.
+"""
+import random
+from typing import List
+
+import docx
+
+from .datagen import COMMON_SKILLS
+
+VERBS = ["Led", "Developed", "Engineered", "Designed", "Managed", "Optimized", "Implemented", "Built", "Created"]
+SOFT = ["communication", "leadership", "teamwork", "problem solving", "mentoring"]
+
+
+def resume_lines(count: int = 60, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    lines = ["Jane Doe - Software Engineer", "jane.doe@example.com | Remote"]
+    while len(lines) < count:
+        skills = ", ".join(rng.sample(COMMON_SKILLS, 3))
+        lines.append(f"{rng.choice(VERBS)} services using {skills} with strong {rng.choice(SOFT)}")
+    return lines
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines: List[str], lines_per_page: int = 50) -> bytes:
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    # Objects: 1 catalog, 2 pages, 3 font, then (page, content) pairs
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages)),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, page in enumerate(pages):
+        content = "BT /F1 10 Tf 14 TL 50 760 Td " + " ".join(f"({_escape(line)}) Tj T*" for line in page) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R "
+            "/Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+    return bytes(out)
+
+
+def make_docx(lines: List[str], path: str):
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
@@ -0,0 +1,206 @@
+"""In-process load driver for the API hot paths.
+
+Usage (from backend/):
+    python -m benchmarks.load [--db bench-1k.db] [--scale 1k] [--requests 300] [--concurrency 16]
+                              [--only "GET /jobs/recommendations" ...] [--out load.json]
+    python -m benchmarks.compare load-before.json load-after.json
+
+Requests go straight into the ASGI app through httpx (no sockets, no
+server), so results reflect the app itself: routing, dependencies, the
+database, indexes and serialization. The database is generated with
+benchmarks.datagen on first use. Each endpoint gets a short warm-up, then
+--requests requests from --concurrency concurrent clients; p50/p90/p99
+latency and requests/second are printed and written to --out as JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from .datagen import COMMON_SKILLS, PASSWORD, SCALES, populate, use_database
+from .documents import make_pdf, resume_lines
+
+API = "/api/v1"
+
+# (method, url, httpx request kwargs)
+Request = Tuple[str, str, dict]
+
+
+class Scenario(NamedTuple):
+    make: Callable[[random.Random], Request]
+    share: float = 1.0  # Fraction of --requests to send (bcrypt-bound routes get fewer)
+
+
+def build_scenarios(job_count: int, seeker_email: str, seeker: dict, recruiter: dict) -> Dict[str, Scenario]:
+    # seeker / recruiter are Authorization headers
+    def job_id(rng):
+        return rng.randint(1, job_count)
+
+    def resume(rng, endpoint="analyze"):
+        # A new document every time, so the resume cache doesn't hide the parsing cost
+        pdf = make_pdf(resume_lines(60, seed=rng.getrandbits(32)))
+        return "POST", f"{API}/resume/{endpoint}", {"files": {"file": ("resume.pdf", pdf, "application/pdf")}}
+
+    return {
+        "GET /jobs/all": Scenario(lambda rng: ("GET", f"{API}/jobs/all", {"params": {"limit": 20}})),
+        "GET /jobs/all?cursor": Scenario(lambda rng: (
+            "GET", f"{API}/jobs/all", {"params": {"limit": 20, "cursor": job_id(rng)}})),
+        "GET /jobs/{id}": Scenario(lambda rng: ("GET", f"{API}/jobs/{job_id(rng)}", {})),
+        "GET /jobs/search": Scenario(lambda rng: (
+            "GET", f"{API}/jobs/search", {"params": {"q": rng.choice(COMMON_SKILLS[:15])}})),
+        "GET /skills/": Scenario(lambda rng: ("GET", f"{API}/skills/", {"headers": seeker})),
+        "GET /jobs/recommendations": Scenario(lambda rng: ("GET", f"{API}/jobs/recommendations", {"headers": seeker})),
+        "GET /jobs/recommendations?weighted": Scenario(lambda rng: (
+            "GET", f"{API}/jobs/recommendations", {"headers": seeker, "params": {"weighted": "true"}})),
+        "GET /jobs/{id}/candidates": Scenario(lambda rng: (
+            "GET", f"{API}/jobs/{job_id(rng)}/candidates", {"headers": recruiter})),
+        "POST /resume/analyze": Scenario(resume, share=0.2),
+        "POST /resume/match": Scenario(lambda rng: resume(rng, "match"), share=0.2),
+        "POST /auth/login": Scenario(lambda rng: (
+            "POST", f"{API}/auth/login", {"json": {"email": seeker_email, "password": PASSWORD}}), share=0.1),
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], statuses: Counter, wall: float) -> dict:
+    values = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": len(values),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(values) / wall, 1) if wall else 0.0,
+        "meanMs": ms(sum(values) / len(values)) if values else 0.0,
+        "p50Ms": ms(percentile(values, 50)),
+        "p90Ms": ms(percentile(values, 90)),
+        "p99Ms": ms(percentile(values, 99)),
+        "maxMs": ms(values[-1]) if values else 0.0,
+    }
+
+
+async def run_scenario(client, scenario: Scenario, total: int, concurrency: int, rng: random.Random) -> dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    sent = 0
+
+    async def client_loop():
+        nonlocal sent
+        while sent < total:
+            sent += 1
+            method, url, kwargs = scenario.make(rng)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(min(concurrency, total))))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+async def login(client, email: str) -> dict:
+    response = await client.post(f"{API}/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import func, select
+    from app import models
+    from app.database import SessionLocal
+    from app.main import app
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        async with SessionLocal() as db:
+            job_count = await db.scalar(select(func.max(models.Job.id)))
+            user_count = await db.scalar(select(func.count()).select_from(models.User))
+            # A job seeker with several skills, and any recruiter
+            seeker_email = await db.scalar(
+                select(models.User.email).join(models.Skill, models.Skill.user_id == models.User.id)
+                .where(models.User.role == models.UserRole.JOBSEEKER)
+                .group_by(models.User.id).having(func.count() >= 5).limit(1)
+            )
+            recruiter_email = await db.scalar(
+                select(models.User.email).where(models.User.role == models.UserRole.RECRUITER).limit(1)
+            )
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            seeker = await login(client, seeker_email)
+            recruiter = await login(client, recruiter_email)
+            scenarios = build_scenarios(job_count, seeker_email, seeker, recruiter)
+            for name in args.only or scenarios:
+                scenario = scenarios[name]
+                rng = random.Random(args.seed)
+                total = max(1, int(args.requests * scenario.share))
+                if not args.no_warmup:
+                    await run_scenario(client, scenario, min(total, 10), args.concurrency, rng)
+                results[name] = run_result = await run_scenario(client, scenario, total, args.concurrency, rng)
+                print(f"{name:<36} {run_result['rps']:>9.1f} req/s  p50 {run_result['p50Ms']:>9.2f} ms  "
+                      f"p99 {run_result['p99Ms']:>9.2f} ms  errors {run_result['errors']}")
+
+    return {"meta": run_meta(args, job_count, user_count), "endpoints": results}
+
+
+def run_meta(args, job_count: int, user_count: int) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "db": args.db,
+        "jobs": job_count,
+        "users": user_count,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test of the API hot paths")
+    parser.add_argument("--db", help="SQLite database to test against (default: bench-<scale>.db)")
+    parser.add_argument("--scale", choices=SCALES, default="1k", help="Size used when the database has to be generated")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", action="append", help="Endpoint name to run (repeatable)")
+    parser.add_argument("--no-warmup", action="store_true")
+    parser.add_argument("--out", default="load.json")
+    args = parser.parse_args()
+    args.db = args.db or f"bench-{args.scale}.db"
+
+    use_database(args.db)
+    if not os.path.exists(args.db):
+        print(f"Generating {args.db} ({args.scale})...", file=sys.stderr)
+        asyncio.run(populate(SCALES[args.scale]))
+
+    report = asyncio.run(run(args))
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Per-row cost of serializing a 10k-job list, before and after the orjson path.
+
+Usage (from backend/): python -m benchmarks.serialization [--rows 10000] [--repeat 5]
+
+"pydantic" is what the jobs routes did before: build a JobResponse per row,
+then let FastAPI validate the list against the response_model and dump it.
+"fast" is the current path: serialization.job_to_dict + orjson.
+"""
+import argparse
+import time
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+from app import models, schemas
+from app.serialization import dumps, job_to_dict
+
+
+def make_jobs(rows: int) -> List[models.Job]:
+    return [
+        models.Job(
+            id=i,
+            title=f"Backend Developer {i}",
+            company="Acme Corp",
+            location="Remote",
+            type="Full-time",
+            salary_range="$100k - $140k",
+            description="Build and run APIs for our matching platform. " * 4,
+            posted_date="2025-11-20",
+            skills=[models.JobSkill(name=name, normalized_name=name.lower()) for name in ("Python", "FastAPI", "SQL", "AWS")],
+        )
+        for i in range(rows)
+    ]
+
+
+def pydantic_path(jobs, adapter) -> bytes:
+    responses = [
+        schemas.JobResponse(
+            id=job.id,
+            title=job.title,
+            company=job.company,
+            location=job.location,
+            type=job.type,
+            salary_range=job.salary_range,
+            requiredSkills=[s.name for s in job.skills],
+            description=job.description,
+            postedDate=job.posted_date,
+            matchScore=50
+        )
+        for job in jobs
+    ]
+    # FastAPI re-validates the returned objects, then serializes by alias
+    return adapter.dump_json(adapter.validate_python(responses, from_attributes=True), by_alias=True)
+
+
+def fast_path(jobs, adapter) -> bytes:
+    return dumps([job_to_dict(job, 50) for job in jobs])
+
+
+def best_of(fn, jobs, adapter, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(jobs, adapter)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.rows)
+    adapter = TypeAdapter(List[schemas.JobResponse])
+    assert orjson.loads(pydantic_path(jobs, adapter)) == orjson.loads(fast_path(jobs, adapter)), "outputs differ"
+
+    results = {name: best_of(fn, jobs, adapter, args.repeat) for name, fn in (("pydantic", pydantic_path), ("fast", fast_path))}
+    for name, seconds in results.items():
+        print(f"{name:>8}: {seconds * 1000:8.1f} ms total, {seconds / args.rows * 1e6:6.2f} us/row")
+    print(f" speedup: {results['pydantic'] / results['fast']:.1f}x")
@@ -0,0 +1,163 @@
+"""Cold start time and per-worker memory of the API server.
+
+Usage (from backend/):
+    python -m benchmarks.startup [--db bench-1k.db] [--runs 5] [--out startup.json]
+    python -m benchmarks.startup --server prefork|uvicorn [--workers 4] [--out startup-prefork.json]
+
+Cold start: each run is a fresh interpreter that imports app.main and runs
+the app's lifespan startup, i.e. what a newly spawned worker does before
+it can serve. Reports import and ready times (from interpreter launch),
+RSS once ready, and which heavy optional modules were imported.
+
+--server starts a real server with --workers processes (python -m app.serve
+or uvicorn --workers), sends a few requests and reports Rss and Pss of
+every worker from /proc (Linux only). Pss splits shared pages between the
+processes sharing them, so it shows what copy-on-write pre-forking saves.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+from .datagen import SCALES, populate, use_database
+
+HEAVY_MODULES = ("pypdf", "docx", "lxml", "numpy", "sqlalchemy", "fastapi")
+
+# Runs in a fresh interpreter; prints one JSON line
+COLD_START = """
+import asyncio, json, sys, time
+started = time.time()
+import app.main as main
+imported = time.time()
+
+async def start(app):
+    async with app.router.lifespan_context(app):
+        return time.time()
+
+ready = asyncio.run(start(main.app))
+rss = 0
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmRSS:"):
+            rss = int(line.split()[1])
+print(json.dumps({
+    "readyAt": ready, "importedAt": imported, "rssKb": rss,
+    "modules": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def cold_start(runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        launched = time.time()
+        out = subprocess.run([sys.executable, "-c", COLD_START % (HEAVY_MODULES,)],
+                             capture_output=True, text=True, check=True).stdout
+        sample = json.loads(out.strip().splitlines()[-1])
+        sample["importMs"] = (sample["importedAt"] - launched) * 1000
+        sample["readyMs"] = (sample["readyAt"] - launched) * 1000
+        samples.append(sample)
+    return {
+        "runs": runs,
+        "importMs": round(statistics.median(s["importMs"] for s in samples), 1),
+        "readyMs": round(statistics.median(s["readyMs"] for s in samples), 1),
+        "rssMb": round(statistics.median(s["rssKb"] for s in samples) / 1024, 1),
+        "modules": samples[-1]["modules"],
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values
+
+
+def children(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def serve(server: str, workers: int, requests: int) -> dict:
+    port = free_port()
+    if server == "prefork":
+        command = [sys.executable, "-m", "app.serve", "--port", str(port), "--workers", str(workers)]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers)]
+    launched = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        while True:
+            try:
+                urllib.request.urlopen(f"{base}/", timeout=1).read()
+                break
+            except OSError:
+                if process.poll() is not None or time.perf_counter() - launched > 120:
+                    raise RuntimeError(f"{server} server did not start")
+                time.sleep(0.05)
+        first_response = time.perf_counter() - launched
+        # Spread some work over the workers so each has loaded what it needs
+        for i in range(requests):
+            urllib.request.urlopen(f"{base}/api/v1/jobs/all?limit=20", timeout=30).read()
+        time.sleep(1)
+        pids = children(process.pid)
+        per_worker = [memory_kb(pid) for pid in pids]
+        parent = memory_kb(process.pid)
+    finally:
+        process.terminate()
+        process.wait(30)
+    mb = lambda kb: round(kb / 1024, 1)
+    return {
+        "server": server,
+        "workers": len(pids),
+        "firstResponseMs": round(first_response * 1000, 1),
+        "parentRssMb": mb(parent.get("Rss", 0)),
+        "workerRssMb": [mb(m.get("Rss", 0)) for m in per_worker],
+        "workerPssMb": [mb(m.get("Pss", 0)) for m in per_worker],
+        "totalPssMb": mb(parent.get("Pss", 0) + sum(m.get("Pss", 0) for m in per_worker)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API cold start time and per-worker memory")
+    parser.add_argument("--db", help="SQLite database to start against (default: bench-<scale>.db)")
+    parser.add_argument("--scale", choices=SCALES, default="1k", help="Size used when the database has to be generated")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to take the median of")
+    parser.add_argument("--server", choices=("prefork", "uvicorn"), help="Measure a running multi-worker server instead")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50, help="Requests sent before memory is sampled")
+    parser.add_argument("--out", default="startup.json")
+    args = parser.parse_args()
+    args.db = args.db or f"bench-{args.scale}.db"
+
+    # Inherited by the subprocesses
+    use_database(args.db)
+    if not os.path.exists(args.db):
+        import asyncio
+        print(f"Generating {args.db} ({args.scale})...", file=sys.stderr)
+        asyncio.run(populate(SCALES[args.scale]))
+
+    report = serve(args.server, args.workers, args.requests) if args.server else cold_start(args.runs)
+    print(json.dumps(report, indent=2))
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
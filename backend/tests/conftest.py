@@ -0,0 +1,77 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+# Behavior tests. From backend/:
+#   python -m pytest tests
+#
+# app.database and app.config read the environment at import time, so the
+# scratch database and index directory are set before any app module loads.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH_DIR = tempfile.mkdtemp(prefix="skillnuron-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{SCRATCH_DIR}/app.db"
+os.environ["JOB_TEXT_INDEX_DIR"] = os.path.join(SCRATCH_DIR, "job-text-index")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+
+def run_migrations(database_url: str, *args: str) -> subprocess.CompletedProcess:
+    """`python -m app.migrations` in a fresh interpreter, as a deployment runs it."""
+    env = {**os.environ, "DATABASE_URL": database_url}
+    return subprocess.run([sys.executable, "-m", "app.migrations", *args], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True)
+
+
+def with_session(fn):
+    """Run fn(session) on a private engine, like another worker process would."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+    from app.database import async_url
+
+    async def run():
+        engine = create_async_engine(async_url(os.environ["DATABASE_URL"]), poolclass=NullPool)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await fn(db)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+
+@pytest.fixture(scope="session")
+def migrated_db():
+    result = run_migrations(os.environ["DATABASE_URL"], "--no-seed")
+    assert result.returncode == 0, result.stderr
+    return os.environ["DATABASE_URL"]
+
+
+@pytest.fixture(scope="session")
+def client(migrated_db):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def login(client):
+    """login(role="jobseeker") -> Authorization headers of a newly signed-up user."""
+
+    def login(role: str = "jobseeker") -> dict:
+        email = f"{uuid.uuid4().hex[:12]}@example.com"
+        user = {"email": email, "full_name": "Test User", "password": "secret-pass", "role": role}
+        assert client.post("/api/v1/auth/signup", json=user).status_code == 200
+        token = client.post("/api/v1/auth/login", json={"email": email, "password": "secret-pass"}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return login
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
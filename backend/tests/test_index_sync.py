@@ -0,0 +1,49 @@
+from app import config
+from app.skill_index import CandidateIndex, SkillIndex
+from app.user_cache import UserCache
+from .conftest import with_session
+
+JOB = {"title": "Zig Engineer", "company": "Acme", "location": "Remote", "type": "Full-time",
+       "salary_range": "1", "required_skills": "Zig, Odin", "description": "Systems work", "posted_date": "2025"}
+
+
+def test_indexes_pick_up_writes_made_elsewhere(client, login):
+    # Stand-ins for another worker's copies, loaded before the writes
+    jobs, candidates = SkillIndex(), CandidateIndex()
+    with_session(jobs.ensure_loaded)
+    with_session(candidates.ensure_loaded)
+
+    recruiter = login("recruiter")
+    job_id = client.post("/api/v1/jobs/", json=JOB, headers=recruiter).json()["id"]
+    seeker = login()
+    client.put("/api/v1/skills/", json=[{"name": "zig", "level": 80, "category": "c"}], headers=seeker)
+    seeker_id = client.get("/api/v1/skills/", headers=seeker).json()[0]["user_id"]
+
+    async def sync(db):
+        await jobs.ensure_loaded(db, sync=True)
+        await candidates.ensure_loaded(db, sync=True)
+
+    with_session(sync)
+    assert (job_id, 50) in jobs.match([("Zig", None)])
+    assert (seeker_id, 50) in candidates.top_candidates(["zig", "odin"], 100)
+
+    client.delete(f"/api/v1/jobs/{job_id}", headers=recruiter)
+    client.put("/api/v1/skills/", json=[], headers=seeker)
+    with_session(sync)
+    assert job_id not in dict(jobs.match([("Zig", None)]))
+    assert seeker_id not in dict(candidates.top_candidates(["zig", "odin"], 100))
+
+
+def test_user_cache_evicts_users_changed_elsewhere(client, login, monkeypatch):
+    monkeypatch.setattr(config, "INDEX_SYNC_SECONDS", 0.0)
+    seeker = login()
+    skill = {"name": "odin", "level": 60, "category": "c"}
+    seeker_id = client.post("/api/v1/skills/", json=skill, headers=seeker).json()["user_id"]
+    # Another worker's cache, holding the user before the write
+    users = UserCache(max_entries=10, ttl=3600)
+    assert [s.name for s in with_session(lambda db: users.load(db, seeker_id)).skills] == ["odin"]
+
+    client.put("/api/v1/skills/", json=[{"name": "zig", "level": 80, "category": "c"}], headers=seeker)
+
+    user = with_session(lambda db: users.load(db, seeker_id))
+    assert [s.name for s in user.skills] == ["zig"]
@@ -0,0 +1,40 @@
+from app.keyword_matcher import KeywordMatcher
+
+
+def test_longest_keyword_wins_at_word_boundaries():
+    matcher = KeywordMatcher({
+        "tech": ["Java", "JavaScript", "C++", "C", "CI/CD", "Machine Learning", "Node.js"],
+        "soft": ["Learning", "Leadership"],
+    })
+    text = "JavaScript and java, C++ (not C#), ci/cd, Machine learning, javas, Node.js. Leadership!"
+    hits = matcher.scan(text)
+    assert hits["tech"] == {
+        "JavaScript": [0],
+        "Java": [15],
+        "C++": [21],
+        "C": [30],
+        "CI/CD": [35],
+        "Machine Learning": [42],
+        "Node.js": [67],
+    }
+    # "learning" is inside the longer "Machine Learning" match
+    assert hits["soft"] == {"Leadership": [76]}
+
+
+def test_keyword_listed_in_two_categories():
+    matcher = KeywordMatcher({"a": ["Python"], "b": ["python"], "c": []})
+    assert matcher.scan("PYTHON python") == {"a": {"Python": [0, 7]}, "b": {"python": [0, 7]}, "c": {}}
+
+
+def test_many_keywords_match_like_one_by_one():
+    keywords = [f"term{i}" for i in range(3000)] + [f"term{i} extra" for i in range(0, 3000, 7)]
+    matcher = KeywordMatcher({"all": keywords})
+    text = " ".join(f"term{i} extra" if i % 2 else f"term{i}x" for i in range(0, 3000, 3))
+    found = matcher.scan(text)["all"]
+    for i in range(0, 3000, 3):
+        if i % 2 == 0:
+            assert f"term{i}" not in found  # Followed by a word character
+        elif i % 7 == 0:
+            assert f"term{i} extra" in found and f"term{i}" not in found
+        else:
+            assert f"term{i}" in found
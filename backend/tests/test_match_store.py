@@ -0,0 +1,67 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app import match_store, models
+from app.change_log import JOB, log_changes
+from app.match_store import MatchRefresher, refresh_users
+from app.skill_index import job_index, job_skill_rows
+from .conftest import with_session
+
+
+def test_refresh_users_sees_jobs_written_by_another_process(client, login):
+    seeker = login()
+    client.put("/api/v1/skills/", json=[{"name": "Nim", "level": 70, "category": "c"}], headers=seeker)
+    seeker_id = client.get("/api/v1/skills/", headers=seeker).json()[0]["user_id"]
+    with_session(job_index.ensure_loaded)
+
+    async def write_job_elsewhere(db):
+        # What another worker's create_job commits; this process's job_index isn't told
+        job = models.Job(title="Nim Developer", company="Acme", location="Remote", type="Full-time",
+                         salary_range="1", description="Compilers", required_skills="Nim",
+                         posted_date="2025", skills=job_skill_rows("Nim"))
+        db.add(job)
+        await db.flush()
+        await log_changes(db, JOB, [job.id])
+        await db.commit()
+        return job.id
+
+    job_id = with_session(write_job_elsewhere)
+    with_session(lambda db: refresh_users(db, [seeker_id]))
+
+    async def stored(db):
+        return dict((await db.execute(
+            select(models.UserJobMatch.job_id, models.UserJobMatch.score)
+            .where(models.UserJobMatch.user_id == seeker_id)
+        )).all())
+
+    assert with_session(stored).get(job_id) == 100
+
+
+def test_failed_refresh_is_retried(monkeypatch):
+    calls = []
+
+    async def flaky_refresh(db, user_ids):
+        calls.append(set(user_ids))
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return 0
+
+    monkeypatch.setattr(match_store, "refresh_users", flaky_refresh)
+    monkeypatch.setattr(match_store, "RETRY_SECONDS", 0.05)
+    refresher = MatchRefresher()
+
+    async def scenario():
+        refresher.start()
+        refresher.enqueue_user(42)
+        # Nothing else is enqueued: only the scheduled retry can run the batch again
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if refresher.batches:
+                break
+        retried = (refresher.failed, refresher.batches, calls[:])
+        await refresher.stop()
+        return retried
+
+    assert asyncio.run(scenario()) == (1, 1, [{42}, {42}])
+    assert not refresher.has_work()
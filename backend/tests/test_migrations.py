@@ -0,0 +1,32 @@
+import sqlite3
+
+from .conftest import run_migrations
+
+
+def index_names(path: str, table: str) -> set:
+    with sqlite3.connect(path) as db:
+        return {name for name, in db.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,))}
+
+
+def test_migrations_run_twice_on_a_fresh_database(tmp_path):
+    path = tmp_path / "fresh.db"
+    for _ in range(2):
+        result = run_migrations(f"sqlite:///{path}")
+        assert result.returncode == 0, result.stderr
+    assert "uq_skills_user_id_lower_name" in index_names(str(path), "skills")
+
+
+def test_migrations_dedupe_skills_before_creating_the_unique_index(tmp_path):
+    path = tmp_path / "legacy.db"
+    assert run_migrations(f"sqlite:///{path}", "--no-seed").returncode == 0
+    # A database from before the index, with the same skill stored in two spellings
+    with sqlite3.connect(path) as db:
+        db.execute("DROP INDEX uq_skills_user_id_lower_name")
+        db.execute("INSERT INTO users (id, email, full_name, hashed_password, role) VALUES (1, 'a@b.c', 'A', 'x', 'JOBSEEKER')")
+        db.execute("INSERT INTO skills (name, level, category, user_id) VALUES ('PYTHON', 10, 'c', 1), ('python', 20, 'c', 1)")
+
+    result = run_migrations(f"sqlite:///{path}", "--no-seed")
+    assert result.returncode == 0, result.stderr
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT name, level FROM skills WHERE user_id = 1").fetchall() == [("python", 20)]
+    assert "uq_skills_user_id_lower_name" in index_names(str(path), "skills")
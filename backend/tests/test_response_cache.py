@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.response_cache import CachedResponse, MemoryBackend, ResponseCache, SqliteBackend, make_entry
+
+JOB = {"title": "Cache Tester", "company": "Acme", "location": "Remote", "type": "Full-time",
+       "salary_range": "1", "required_skills": "Python", "description": "Caching", "posted_date": "2025"}
+
+
+def get_request(path: str = "/api/v1/jobs/") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(max_entries=2, ttl=60)
+    return SqliteBackend(str(tmp_path / "cache.db"), max_entries=2, ttl=60)
+
+
+def test_writes_invalidate_cached_job(client, login):
+    recruiter = login("recruiter")
+    job_id = client.post("/api/v1/jobs/", json=JOB, headers=recruiter).json()["id"]
+    first = client.get(f"/api/v1/jobs/{job_id}")
+    assert client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    client.put(f"/api/v1/jobs/{job_id}", json={**JOB, "title": "Cache Buster"}, headers=recruiter)
+    after = client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": first.headers["etag"]})
+    assert after.status_code == 200
+    assert after.json()["title"] == "Cache Buster"
+
+
+def test_response_built_across_an_invalidation_is_not_stored(backend):
+    cache = ResponseCache(backend)
+
+    async def run():
+        async def build_while_a_write_lands():
+            await cache.invalidate()
+            return {"stale": True}
+
+        async def build_fresh():
+            return {"stale": False}
+
+        await cache.respond(get_request(), build_while_a_write_lands)
+        return await cache.respond(get_request(), build_fresh)
+
+    assert asyncio.run(run()).body == b'{"stale":false}'
+    assert cache.stats()["misses"] == 2
+
+
+def test_backends_are_bounded(backend):
+    async def run():
+        generation = await backend.generation()
+        for key in ("a", "b", "c"):
+            await backend.put(key, make_entry(key.encode()), generation)
+        return [await backend.get(key) for key in ("a", "b", "c")]
+
+    assert [entry.body if entry else None for entry in asyncio.run(run())] == [None, b"b", b"c"]
+    assert len(backend) == 2
+
+
+def test_expired_entries_are_not_served(backend):
+    async def run():
+        await backend.put("old", CachedResponse(b"{}", '"x"', 0), await backend.generation())
+        return await backend.get("old")
+
+    assert asyncio.run(run()) is None
+
+
+def test_cache_counters_are_exported_as_metrics(client):
+    client.get("/api/v1/jobs/all")
+    client.get("/api/v1/jobs/all")
+    samples = dict(line.rsplit(" ", 1) for line in client.get("/metrics").text.splitlines() if not line.startswith("#"))
+    assert float(samples["response_cache_hits_total"]) >= 1
+    assert "response_cache_entries" in samples
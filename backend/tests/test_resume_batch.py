@@ -0,0 +1,67 @@
+import io
+import json
+import os
+import tempfile
+import zipfile
+
+import pytest
+
+from app import config
+
+
+def make_zip(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    # Every spooled upload and extracted member lands here, so leftovers are visible
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return tmp_path
+
+
+def post_batch(client, headers, *files):
+    return client.post("/api/v1/resume/analyze/batch", headers=headers,
+                       files=[("files", (name, data)) for name, data in files])
+
+
+def test_zip_with_too_many_documents_is_refused_before_extraction(client, login, spool_dir, monkeypatch):
+    monkeypatch.setattr(config, "RESUME_BATCH_MAX_FILES", 3)
+    archive = make_zip({f"cv{i}.pdf": b"%PDF-1.4" for i in range(4)})
+
+    response = post_batch(client, login("recruiter"), ("cvs.zip", archive))
+    assert response.status_code == 413
+    assert "At most 3 documents" in response.json()["detail"]
+    assert os.listdir(spool_dir) == []
+
+
+def test_zip_members_count_toward_the_batch_byte_limit(client, login, spool_dir, monkeypatch):
+    monkeypatch.setattr(config, "RESUME_BATCH_MAX_BYTES", 150_000)
+    # Compresses to almost nothing, so only the extracted size can trip the limit
+    archive = make_zip({f"cv{i}.pdf": b"\0" * 100_000 for i in range(2)})
+
+    response = post_batch(client, login("recruiter"), ("cvs.zip", archive))
+    assert response.status_code == 413
+    assert os.listdir(spool_dir) == []
+
+
+def test_direct_files_and_zip_members_share_the_document_limit(client, login, spool_dir, monkeypatch):
+    monkeypatch.setattr(config, "RESUME_BATCH_MAX_FILES", 2)
+    archive = make_zip({"a.pdf": b"%PDF-1.4", "b.pdf": b"%PDF-1.4"})
+
+    response = post_batch(client, login("recruiter"), ("c.pdf", b"%PDF-1.4"), ("cvs.zip", archive))
+    assert response.status_code == 413
+    assert os.listdir(spool_dir) == []
+
+
+def test_unsupported_members_get_their_own_error_lines(client, login, spool_dir):
+    archive = make_zip({"notes.txt": b"hello", "photo.png": b"\x89PNG"})
+
+    response = post_batch(client, login("recruiter"), ("cvs.zip", archive))
+    assert response.status_code == 200
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted((item["filename"], item["status"]) for item in items) == [("notes.txt", 400), ("photo.png", 400)]
@@ -0,0 +1,23 @@
+import asyncio
+
+from app.resume_cache import ResumeCache
+
+
+def test_sqlite_tier_survives_restarts_and_keeps_the_newest_rows(tmp_path):
+    path = str(tmp_path / "resume-cache.db")
+
+    async def fill():
+        cache = ResumeCache(max_entries=1, max_bytes=1 << 20, db_path=path, max_db_entries=2)
+        for n in range(3):
+            await cache.put(f"k{n}", f"text {n}", {"n": n})
+
+    async def read():
+        # A fresh process: nothing in memory
+        cache = ResumeCache(max_entries=8, max_bytes=1 << 20, db_path=path, max_db_entries=2)
+        found = [await cache.get(f"k{n}") for n in range(3)]
+        return [entry and entry.analysis for entry in found], cache.stats()
+
+    asyncio.run(fill())
+    found, stats = asyncio.run(read())
+    assert found == [None, {"n": 1}, {"n": 2}]
+    assert (stats["diskHits"], stats["misses"]) == (2, 1)
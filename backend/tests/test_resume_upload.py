@@ -0,0 +1,57 @@
+import asyncio
+import hashlib
+import os
+from tempfile import SpooledTemporaryFile
+
+from fastapi import UploadFile
+from starlette.formparsers import MultiPartParser
+
+from app import config
+from app.routers.resume import spool_upload
+
+
+def starlette_upload(data: bytes, filename: str = "cv.pdf") -> UploadFile:
+    # What Starlette's multipart parser hands the route
+    spool = SpooledTemporaryFile(max_size=MultiPartParser.spool_max_size)
+    spool.write(data)
+    return UploadFile(spool, size=len(data), filename=filename)
+
+
+def test_small_upload_is_read_in_place():
+    data = b"%PDF-1.4 small"
+    source, sha256_hex, path = asyncio.run(spool_upload(starlette_upload(data)))
+    assert (source, sha256_hex, path) == (data, hashlib.sha256(data).hexdigest(), None)
+
+
+def test_rolled_over_upload_gets_a_named_copy():
+    data = os.urandom(MultiPartParser.spool_max_size + 1)
+    source, sha256_hex, path = asyncio.run(spool_upload(starlette_upload(data)))
+    try:
+        assert source == path
+        assert sha256_hex == hashlib.sha256(data).hexdigest()
+        with open(path, "rb") as f:
+            assert f.read() == data
+    finally:
+        os.unlink(path)
+
+
+def test_oversized_upload_is_refused_before_parsing(client, monkeypatch):
+    monkeypatch.setattr(config, "RESUME_MAX_UPLOAD_BYTES", 1000)
+    response = client.post("/api/v1/resume/analyze", files={"file": ("cv.pdf", b"x" * 50_000)})
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("Request body exceeds")
+
+
+def test_chunked_upload_is_cut_off_once_past_the_limit(client, monkeypatch):
+    monkeypatch.setattr(config, "RESUME_MAX_UPLOAD_BYTES", 1000)
+
+    def body():
+        # No Content-Length: only counting the received chunks can catch this one
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="cv.pdf"\r\n\r\n'
+        for _ in range(100):
+            yield b"x" * 8192
+        yield b"\r\n--b--\r\n"
+
+    response = client.post("/api/v1/resume/analyze", content=body(),
+                           headers={"Content-Type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
@@ -0,0 +1,29 @@
+JOB = {"company": "Acme", "location": "Remote", "type": "Full-time", "salary_range": "1",
+       "description": "BEAM work", "posted_date": "2025"}
+
+
+def test_gap_ranks_skills_by_jobs_unlocked(client, login):
+    recruiter = login("recruiter")
+    for title, skills in (("A", "Erlang, Elixir, OTP"), ("B", "Erlang, Elixir, BEAM"), ("C", "Erlang, Gleam, BEAM")):
+        client.post("/api/v1/jobs/", json={**JOB, "title": title, "required_skills": skills}, headers=recruiter)
+    seeker = login()
+    client.put("/api/v1/skills/", json=[{"name": "erlang", "level": 60, "category": "c"}], headers=seeker)
+
+    gap = client.get("/api/v1/skills/gap?limit=4", headers=seeker).json()
+    # Each job is at 1/3 of its skills: one more lifts it to 67%, over the threshold
+    assert (gap["threshold"], gap["matchingJobs"]) == (50, 0)
+    assert [(s["skill"], s["unlockedJobs"], s["jobsRequiring"], s["coOccurrence"]) for s in gap["skills"]] == [
+        # Ties on jobs unlocked go to co-occurrence with the user's skills, then frequency, then name
+        ("BEAM", 2, 2, 2),
+        ("Elixir", 2, 2, 2),
+        ("Gleam", 1, 1, 1),
+        ("OTP", 1, 1, 1),
+    ]
+
+    client.put("/api/v1/skills/", json=[{"name": "Erlang", "level": 60, "category": "c"},
+                                        {"name": "Elixir", "level": 60, "category": "c"}], headers=seeker)
+    gap = client.get("/api/v1/skills/gap?limit=1", headers=seeker).json()
+    assert gap["matchingJobs"] == 2
+    # BEAM lifts C (1/3 -> 2/3); B already matches
+    assert [(s["skill"], s["unlockedJobs"]) for s in gap["skills"]] == [("BEAM", 1)]
+    assert client.get("/api/v1/skills/gap").status_code in (401, 403)
@@ -0,0 +1,62 @@
+import warnings
+
+from pydantic.warnings import PydanticDeprecatedSince20
+
+from app import config
+
+
+def skill(name, level=50, category="Technical"):
+    return {"name": name, "level": level, "category": category}
+
+
+def by_name(skills):
+    return {s["name"]: s for s in skills}
+
+
+def test_put_replaces_the_skill_set(client, login):
+    headers = login()
+    with warnings.catch_warnings():
+        # No pydantic v1 API (.dict(), .copy()) on the write path
+        warnings.simplefilter("error", PydanticDeprecatedSince20)
+        first = client.put("/api/v1/skills/", json=[skill("Python"), skill("SQL"), skill("Docker")], headers=headers)
+    assert first.status_code == 200
+    assert sorted(by_name(first.json())) == ["Docker", "Python", "SQL"]
+    ids = {s["name"]: s["id"] for s in first.json()}
+
+    # Changed level keeps the row, a missing skill is deleted, a new one added;
+    # names are matched case-insensitively and the last duplicate wins
+    second = client.put("/api/v1/skills/", json=[
+        skill("python", 90), skill("SQL"), skill("go", 10), skill("Go", 20),
+    ], headers=headers)
+    assert second.status_code == 200
+    skills = by_name(second.json())
+    assert sorted(skills) == ["Go", "SQL", "python"]
+    assert skills["python"]["id"] == ids["Python"] and skills["python"]["level"] == 90
+    assert skills["SQL"]["id"] == ids["SQL"]
+    assert skills["Go"]["level"] == 20
+    assert sorted(by_name(client.get("/api/v1/skills/", headers=headers).json())) == ["Go", "SQL", "python"]
+
+    # Submitting the stored set again changes nothing
+    again = client.put("/api/v1/skills/", json=[skill("python", 90), skill("SQL"), skill("Go", 20)], headers=headers)
+    assert sorted(s["id"] for s in again.json()) == sorted(s["id"] for s in second.json())
+
+
+def test_put_validates_names_and_size(client, login):
+    headers = login()
+    assert client.put("/api/v1/skills/", json=[skill("  ")], headers=headers).status_code == 400
+    too_many = [skill(f"Skill {i}") for i in range(config.SKILLS_MAX_PER_USER + 1)]
+    assert client.put("/api/v1/skills/", json=too_many, headers=headers).status_code == 400
+    assert client.put("/api/v1/skills/", json=[], headers=headers).json() == []
+
+
+def test_post_upserts_and_delete_ignores_case(client, login):
+    headers = login()
+    created = client.post("/api/v1/skills/", json=skill("React", 40), headers=headers).json()
+    updated = client.post("/api/v1/skills/", json=skill(" react ", 70), headers=headers)
+    assert updated.status_code == 200
+    assert updated.json()["id"] == created["id"] and updated.json()["level"] == 70
+    assert len(client.get("/api/v1/skills/", headers=headers).json()) == 1
+
+    assert client.delete("/api/v1/skills/REACT", headers=headers).status_code == 200
+    assert client.get("/api/v1/skills/", headers=headers).json() == []
+    assert client.delete("/api/v1/skills/React", headers=headers).status_code == 404
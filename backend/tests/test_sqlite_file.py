@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from app.database import SqliteFile
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="POSIX only")
+def test_forked_child_opens_its_own_connection(tmp_path):
+    db = SqliteFile(str(tmp_path / "side.db"), "CREATE TABLE IF NOT EXISTS t (pid INTEGER)")
+    parent = db.connect()
+    assert db.connect() is parent
+
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            child = db.connect()
+            child.execute("INSERT INTO t VALUES (?)", (os.getpid(),))
+            child.commit()
+            code = 0 if child is not parent else 1
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert parent.execute("SELECT pid FROM t").fetchall() == [(pid,)]
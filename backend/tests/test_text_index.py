@@ -0,0 +1,48 @@
+from app import config
+from app.text_index import JobTextIndex, build_lock
+from .conftest import with_session
+
+JOB = {"title": "Quokka Wrangler", "company": "Acme", "location": "Remote", "type": "Full-time",
+       "salary_range": "1", "required_skills": "Zephyrology", "description": "Herding quokkas", "posted_date": "2025"}
+
+
+def test_overlay_picks_up_writes_made_elsewhere(client, login):
+    # Another worker's copy, sharing the segment directory but not this process's overlay
+    index = JobTextIndex(config.JOB_TEXT_INDEX_DIR)
+    with_session(index.ensure_loaded)
+    recruiter = login("recruiter")
+
+    job_id = client.post("/api/v1/jobs/", json=JOB, headers=recruiter).json()["id"]
+    with_session(lambda db: index.sync(db, force=True))
+    assert index.search("quokka wrangler zephyrology")[0][0] == job_id
+
+    client.put(f"/api/v1/jobs/{job_id}", json={**JOB, "title": "Wombat Wrangler"}, headers=recruiter)
+    with_session(lambda db: index.sync(db, force=True))
+    assert index.search("wombat")[0][0] == job_id
+
+    client.delete(f"/api/v1/jobs/{job_id}", headers=recruiter)
+    with_session(lambda db: index.sync(db, force=True))
+    assert job_id not in dict(index.search("wombat quokka wrangler zephyrology"))
+
+
+def test_rebuild_folds_the_overlay_into_a_segment(client, login):
+    index = JobTextIndex(config.JOB_TEXT_INDEX_DIR)
+    job_id = client.post("/api/v1/jobs/", json={**JOB, "title": "Axolotl Keeper"}, headers=login("recruiter")).json()["id"]
+    with_session(index.ensure_loaded)
+    with_session(index.rebuild)
+
+    assert index.stats()["pendingJobs"] == 0
+    assert index.search("axolotl keeper")[0][0] == job_id
+    # A fresh copy maps the new segment and has nothing to replay
+    other = JobTextIndex(config.JOB_TEXT_INDEX_DIR)
+    with_session(other.ensure_loaded)
+    assert other.stats()["generation"] == index.stats()["generation"]
+    assert other.search("axolotl keeper")[0][0] == job_id
+
+
+def test_build_lock_admits_one_builder(tmp_path):
+    with build_lock(str(tmp_path)) as first:
+        with build_lock(str(tmp_path)) as second:
+            assert (first, second) == (True, False)
+    with build_lock(str(tmp_path)) as again:
+        assert again
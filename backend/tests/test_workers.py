@@ -0,0 +1,27 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.workers import BoundedPool
+
+
+def test_timed_out_job_frees_its_slot():
+    pool = BoundedPool("test", workers=1, max_pending=1, timeout=3)
+
+    async def scenario():
+        with pytest.raises(HTTPException) as stuck:
+            await pool.run(time.sleep, 3600)
+        assert stuck.value.status_code == 504
+        # The stuck worker was killed, so the only slot is free again
+        assert pool.pending == 0
+        return await pool.run(abs, -7)
+
+    try:
+        assert asyncio.run(scenario()) == 7
+    finally:
+        pool.shutdown()
+    stats = pool.stats()
+    assert stats["timedOut"] == 1
+    assert stats["completed"] == 1